@@ -1,13 +1,15 @@
 """配置管理模块"""
 
 import os
+from dataclasses import dataclass
 from pathlib import Path
-from dotenv import load_dotenv
 
-# 加载 .env 文件
+# 加载 .env 文件（环境变量已配置时跳过，省去重复解析；dotenv 延迟导入）
 _env_path = Path(__file__).parent / ".env"
-if _env_path.exists():
-    load_dotenv(_env_path)
+if _env_path.exists() and not os.getenv("FEISHU_APP_ID"):
+    from dotenv import load_dotenv
+
+    load_dotenv(_env_path, override=False)
 
 # 飞书配置
 FEISHU_APP_ID = os.getenv("FEISHU_APP_ID", "")
@@ -25,6 +27,10 @@ FEISHU_PERMISSION_URL = f"{FEISHU_BASE_URL}/drive/v1/permissions/{{token}}/membe
 FEISHU_WIKI_GET_NODE_URL = f"{FEISHU_BASE_URL}/wiki/v2/spaces/get_node"
 FEISHU_WIKI_CREATE_NODE_URL = f"{FEISHU_BASE_URL}/wiki/v2/spaces/{{space_id}}/nodes"
 
+# 请求体 gzip 压缩（默认关闭：飞书 OpenAPI 未声明接受压缩请求体，
+# 仅在确认网关支持 Content-Encoding: gzip 后再显式打开）
+FEISHU_GZIP_BODY = os.getenv("FEISHU_GZIP_BODY", "0") == "1"
+
 # 新闻配置
 NEWS_MAX_ARTICLES = int(os.getenv("NEWS_MAX_ARTICLES", "15"))
 NEWS_LANGUAGE = os.getenv("NEWS_LANGUAGE", "zh")
@@ -81,6 +87,32 @@ NEWS_SOURCES = [
     },
 ]
 
+# 配置快照：冻结 + __slots__，属性访问比模块 dict 查找更快，且运行期不可变
+@dataclass(frozen=True, slots=True)
+class Config:
+    app_id: str
+    app_secret: str
+    folder_token: str
+    wiki_node_token: str
+    base_url: str
+    token_url: str
+    create_doc_url: str
+    group_chat_id: str
+    group_name: str
+
+
+cfg = Config(
+    app_id=FEISHU_APP_ID,
+    app_secret=FEISHU_APP_SECRET,
+    folder_token=FEISHU_FOLDER_TOKEN,
+    wiki_node_token=FEISHU_WIKI_NODE_TOKEN,
+    base_url=FEISHU_BASE_URL,
+    token_url=FEISHU_TOKEN_URL,
+    create_doc_url=FEISHU_CREATE_DOC_URL,
+    group_chat_id=FEISHU_GROUP_CHAT_ID,
+    group_name=FEISHU_GROUP_NAME,
+)
+
 # 搜索关键词
 SEARCH_QUERIES = [
     "AI news today 2026",
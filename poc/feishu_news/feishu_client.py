@@ -1,35 +1,134 @@
 """飞书 Open API 客户端 —— 认证、文档创建、内容写入、权限管理"""
 
+import gzip
 import time
 import logging
 import json
+import threading
+from functools import lru_cache
+
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from typing import Optional
 from urllib.parse import quote
 
-from config import (
-    FEISHU_APP_ID,
-    FEISHU_APP_SECRET,
-    FEISHU_BASE_URL,
-    FEISHU_TOKEN_URL,
-    FEISHU_CREATE_DOC_URL,
-    FEISHU_FOLDER_TOKEN,
-    FEISHU_WIKI_NODE_TOKEN,
-    FEISHU_WIKI_GET_NODE_URL,
-    FEISHU_WIKI_CREATE_NODE_URL,
-)
+from config import FEISHU_GZIP_BODY, cfg
 
 logger = logging.getLogger(__name__)
 
+# JSON 序列化：优先 orjson（Rust 实现，直接输出 UTF-8 bytes），未安装时回退 stdlib
+try:
+    import orjson
+
+    def _dump_json(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def _load_json(raw: bytes) -> dict:
+        return orjson.loads(raw)
+
+except ImportError:
+
+    def _dump_json(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def _load_json(raw: bytes) -> dict:
+        return json.loads(raw)
+
+
+# 中文 JSON 压缩率通常 3~5x；小于该阈值时压缩头部开销反而亏本
+_GZIP_MIN_BYTES = 1024
+
+
+def _encode_body(payload: dict) -> "tuple[bytes, Optional[str]]":
+    """序列化请求体，返回 (body, content_encoding)
+
+    压缩需显式开启 FEISHU_GZIP_BODY：飞书未文档化对压缩请求体的支持，
+    默认压缩一旦被网关拒收会让整个写入阶段失败
+    """
+    body = _dump_json(payload)
+    if FEISHU_GZIP_BODY and len(body) >= _GZIP_MIN_BYTES:
+        return gzip.compress(body, compresslevel=6), "gzip"
+    return body, None
+
+
+# ── 富文本 Block 构建器（纯函数，不依赖客户端状态）───────────
+
+def heading_block(text: str, level: int = 2) -> dict:
+    heading_map = {
+        1: "heading1", 2: "heading2", 3: "heading3",
+        4: "heading4", 5: "heading5", 6: "heading6",
+    }
+    type_map = {
+        "heading1": 3, "heading2": 4, "heading3": 5,
+        "heading4": 6, "heading5": 7, "heading6": 8,
+    }
+    key = heading_map.get(level, "heading2")
+    return {
+        "block_type": type_map[key],
+        key: {"elements": [{"text_run": {"content": text}}]},
+    }
+
+
+def text_block(text: str, bold: bool = False) -> dict:
+    element = {"text_run": {"content": text}}
+    if bold:
+        element["text_run"]["text_element_style"] = {"bold": True}
+    return {"block_type": 2, "text": {"elements": [element]}}
+
+
+def link_block(text: str, url: str) -> dict:
+    encoded_url = quote(url, safe="")
+    return {
+        "block_type": 2,
+        "text": {
+            "elements": [
+                {
+                    "text_run": {
+                        "content": text,
+                        "text_element_style": {"link": {"url": encoded_url}},
+                    }
+                }
+            ]
+        },
+    }
+
+
+def divider_block() -> dict:
+    return {"block_type": 22, "divider": {}}
+
+
+def bullet_block(text: str) -> dict:
+    return {
+        "block_type": 12,
+        "bullet": {"elements": [{"text_run": {"content": text}}]},
+    }
+
 
 class FeishuClient:
     """飞书 API 客户端"""
 
     def __init__(self, app_id: str = "", app_secret: str = ""):
-        self.app_id = app_id or FEISHU_APP_ID
-        self.app_secret = app_secret or FEISHU_APP_SECRET
+        self.app_id = app_id or cfg.app_id
+        self.app_secret = app_secret or cfg.app_secret
         self._tenant_token: Optional[str] = None
         self._token_expires_at: float = 0
+        self._headers_cache: Optional[dict] = None
+        self._token_lock = threading.Lock()
+
+        # 持久 Session：keep-alive 复用 TCP/TLS 连接，批量写入时省去每次握手
+        self._session = requests.Session()
+        self._session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=8,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                ),
+            ),
+        )
 
         if not self.app_id or not self.app_secret:
             raise ValueError(
@@ -41,31 +140,40 @@ class FeishuClient:
     # ── 认证 ──────────────────────────────────────────────
 
     def _get_tenant_token(self) -> str:
-        """获取 tenant_access_token (自动缓存与续期)"""
+        """获取 tenant_access_token (自动缓存与续期，双重检查加锁保证线程安全)"""
         if self._tenant_token and time.time() < self._token_expires_at:
             return self._tenant_token
 
-        resp = requests.post(
-            FEISHU_TOKEN_URL,
-            json={"app_id": self.app_id, "app_secret": self.app_secret},
-            timeout=10,
-        )
-        resp.raise_for_status()
-        data = resp.json()
+        with self._token_lock:
+            # 拿到锁后复查：并发线程可能已完成刷新
+            if self._tenant_token and time.time() < self._token_expires_at:
+                return self._tenant_token
 
-        if data.get("code") != 0:
-            raise RuntimeError(f"获取 tenant_access_token 失败: {data.get('msg')}")
+            resp = self._session.post(
+                cfg.token_url,
+                headers={"Content-Type": "application/json; charset=utf-8"},
+                data=_dump_json({"app_id": self.app_id, "app_secret": self.app_secret}),
+                timeout=10,
+            )
+            resp.raise_for_status()
+            data = _load_json(resp.content)
 
-        self._tenant_token = data["tenant_access_token"]
-        self._token_expires_at = time.time() + data.get("expire", 7200) - 300
-        logger.info("✅ 飞书认证成功")
-        return self._tenant_token
+            if data.get("code") != 0:
+                raise RuntimeError(f"获取 tenant_access_token 失败: {data.get('msg')}")
+
+            # token 刷新时同步重建 headers 缓存，避免每次请求重新格式化
+            self._headers_cache = {
+                "Authorization": f"Bearer {data['tenant_access_token']}",
+                "Content-Type": "application/json; charset=utf-8",
+            }
+            self._token_expires_at = time.time() + data.get("expire", 7200) - 300
+            self._tenant_token = data["tenant_access_token"]
+            logger.info("✅ 飞书认证成功")
+            return self._tenant_token
 
     def _headers(self) -> dict:
-        return {
-            "Authorization": f"Bearer {self._get_tenant_token()}",
-            "Content-Type": "application/json; charset=utf-8",
-        }
+        self._get_tenant_token()
+        return self._headers_cache
 
     def test_connection(self) -> bool:
         """测试飞书 API 连通性"""
@@ -86,17 +194,17 @@ class FeishuClient:
         """
         # 1) 通过 Drive API 创建文档
         payload = {"title": title}
-        if FEISHU_FOLDER_TOKEN:
-            payload["folder_token"] = FEISHU_FOLDER_TOKEN
+        if cfg.folder_token:
+            payload["folder_token"] = cfg.folder_token
 
-        resp = requests.post(
-            FEISHU_CREATE_DOC_URL,
+        resp = self._session.post(
+            cfg.create_doc_url,
             headers=self._headers(),
-            json=payload,
+            data=_dump_json(payload),
             timeout=15,
         )
         resp.raise_for_status()
-        data = resp.json()
+        data = _load_json(resp.content)
 
         if data.get("code") != 0:
             raise RuntimeError(f"创建文档失败 (code={data.get('code')}): {data.get('msg')}")
@@ -110,7 +218,7 @@ class FeishuClient:
 
         # 3) 尝试移入知识库 (如果配置了 wiki token)
         wiki_url = None
-        if FEISHU_WIKI_NODE_TOKEN:
+        if cfg.wiki_node_token:
             wiki_url = self._try_move_to_wiki(doc_id)
 
         url = wiki_url or f"https://feishu.cn/docx/{doc_id}"
@@ -120,7 +228,7 @@ class FeishuClient:
 
     def _set_link_sharing(self, doc_id: str):
         """设置文档链接分享为 '知道链接的人可阅读'"""
-        perm_url = f"{FEISHU_BASE_URL}/drive/v1/permissions/{doc_id}/public?type=docx"
+        perm_url = f"{cfg.base_url}/drive/v1/permissions/{doc_id}/public?type=docx"
         payload = {
             "external_access_entity": "open",
             "security_entity": "anyone_can_view",
@@ -129,11 +237,11 @@ class FeishuClient:
             "link_share_entity": "anyone_readable",
         }
         try:
-            resp = requests.patch(
-                perm_url, headers=self._headers(), json=payload, timeout=10,
+            resp = self._session.patch(
+                perm_url, headers=self._headers(), data=_dump_json(payload), timeout=10,
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = _load_json(resp.content)
             if data.get("code") == 0:
                 logger.info("🔓 链接分享已开启 (任何人可通过链接查看)")
             else:
@@ -145,9 +253,9 @@ class FeishuClient:
         """尝试将文档移入知识库 (可能因权限不足而失败，不影响主流程)"""
         try:
             # 获取 wiki 信息
-            url1 = f"{FEISHU_BASE_URL}/wiki/v2/spaces/get_node?token={FEISHU_WIKI_NODE_TOKEN}"
-            node_resp = requests.get(url1, headers=self._headers(), timeout=10)
-            node_data = node_resp.json()
+            url1 = f"{cfg.base_url}/wiki/v2/spaces/get_node?token={cfg.wiki_node_token}"
+            node_resp = self._session.get(url1, headers=self._headers(), timeout=10)
+            node_data = _load_json(node_resp.content)
             if node_data.get("code") != 0:
                 return None
 
@@ -156,16 +264,16 @@ class FeishuClient:
             parent_token = node["node_token"]
 
             # 移入知识库
-            move_url = f"{FEISHU_BASE_URL}/wiki/v2/spaces/{space_id}/nodes/move_docs_to_wiki"
+            move_url = f"{cfg.base_url}/wiki/v2/spaces/{space_id}/nodes/move_docs_to_wiki"
             move_payload = {
                 "parent_wiki_token": parent_token,
                 "obj_type": "docx",
                 "obj_token": doc_id,
             }
-            resp = requests.post(
-                move_url, headers=self._headers(), json=move_payload, timeout=15,
+            resp = self._session.post(
+                move_url, headers=self._headers(), data=_dump_json(move_payload), timeout=15,
             )
-            data = resp.json()
+            data = _load_json(resp.content)
             if data.get("code") == 0:
                 wiki_node = data["data"]["node"]
                 wiki_url = f"https://feishu.cn/wiki/{wiki_node['node_token']}"
@@ -181,18 +289,18 @@ class FeishuClient:
 
     def write_blocks(self, document_id: str, block_id: str, children: list, index: int = -1) -> dict:
         """向文档指定 block 追加子 block"""
-        url = f"{FEISHU_BASE_URL}/docx/v1/documents/{document_id}/blocks/{block_id}/children?document_revision_id=-1"
+        url = f"{cfg.base_url}/docx/v1/documents/{document_id}/blocks/{block_id}/children?document_revision_id=-1"
         payload = {"children": children}
         if index >= 0:
             payload["index"] = index
-        resp = requests.post(
-            url,
-            headers=self._headers(),
-            json=payload,
-            timeout=30,
-        )
+        # children 体量大，预序列化绕开 requests 内部的 stdlib json 编码
+        body, encoding = _encode_body(payload)
+        headers = self._headers()
+        if encoding:
+            headers = {**headers, "Content-Encoding": encoding}
+        resp = self._session.post(url, headers=headers, data=body, timeout=30)
         resp.raise_for_status()
-        data = resp.json()
+        data = _load_json(resp.content)
 
         if data.get("code") != 0:
             raise RuntimeError(
@@ -200,6 +308,42 @@ class FeishuClient:
             )
         return data.get("data", {})
 
+    def write_blocks_bulk(
+        self, document_id: str, block_id: str, children: list, chunk_size: int = 50
+    ) -> None:
+        """分批写入大量 block（飞书单次上限 50 个），摊薄每次请求的固定开销
+
+        追加子 block 依赖文档顺序，批次必须串行提交；但 URL/headers 只算一次、
+        所有批次预先编码，网络循环里只剩 keep-alive 连接上的 POST 本身。
+        """
+        url = (
+            f"{cfg.base_url}/docx/v1/documents/{document_id}"
+            f"/blocks/{block_id}/children?document_revision_id=-1"
+        )
+        headers = self._headers()
+        gzip_headers = {**headers, "Content-Encoding": "gzip"}
+        total = len(children)
+        payloads = [
+            _encode_body({"children": children[i : i + chunk_size]})
+            for i in range(0, total, chunk_size)
+        ]
+        written = 0
+        for body, encoding in payloads:
+            resp = self._session.post(
+                url,
+                headers=gzip_headers if encoding else headers,
+                data=body,
+                timeout=30,
+            )
+            resp.raise_for_status()
+            data = _load_json(resp.content)
+            if data.get("code") != 0:
+                raise RuntimeError(
+                    f"写入文档失败 (code={data.get('code')}): {data.get('msg')}"
+                )
+            written = min(written + chunk_size, total)
+            logger.info(f"   已写入 {written}/{total} blocks")
+
     def get_document_root_block(self, document_id: str) -> str:
         """获取文档根 block_id"""
         return document_id
@@ -208,30 +352,32 @@ class FeishuClient:
 
     def send_group_message(self, chat_id: str, text: str) -> dict:
         """发送文本消息到飞书群聊"""
-        url = f"{FEISHU_BASE_URL}/im/v1/messages?receive_id_type=chat_id"
+        url = f"{cfg.base_url}/im/v1/messages?receive_id_type=chat_id"
         payload = {
             "receive_id": chat_id,
             "msg_type": "text",
-            "content": json.dumps({"text": text}),
+            "content": _dump_json({"text": text}).decode(),
         }
-        resp = requests.post(url, headers=self._headers(), json=payload, timeout=10)
+        resp = self._session.post(
+            url, headers=self._headers(), data=_dump_json(payload), timeout=10
+        )
         resp.raise_for_status()
-        data = resp.json()
+        data = _load_json(resp.content)
         if data.get("code") != 0:
             raise RuntimeError(f"发送群消息失败 (code={data.get('code')}): {data.get('msg')}")
         return data
 
     def find_chat_id_by_name(self, name: str) -> Optional[str]:
         """通过群名称查找 chat_id（需开通 im:chat:readonly 权限）"""
-        url = f"{FEISHU_BASE_URL}/im/v1/chats"
+        url = f"{cfg.base_url}/im/v1/chats"
         page_token = None
         while True:
             params = {"page_size": 100}
             if page_token:
                 params["page_token"] = page_token
-            resp = requests.get(url, headers=self._headers(), params=params, timeout=10)
+            resp = self._session.get(url, headers=self._headers(), params=params, timeout=10)
             resp.raise_for_status()
-            data = resp.json()
+            data = _load_json(resp.content)
             if data.get("code") != 0:
                 raise RuntimeError(
                     f"获取群列表失败 (code={data.get('code')}): {data.get('msg')}"
@@ -244,55 +390,16 @@ class FeishuClient:
             page_token = data["data"].get("page_token")
         return None
 
-    # ── 富文本 Block 构建器 ────────────────────────────────
+    # ── 富文本 Block 构建器（兼容旧调用方式，实际为模块级纯函数）──
 
-    @staticmethod
-    def heading_block(text: str, level: int = 2) -> dict:
-        heading_map = {
-            1: "heading1", 2: "heading2", 3: "heading3",
-            4: "heading4", 5: "heading5", 6: "heading6",
-        }
-        type_map = {
-            "heading1": 3, "heading2": 4, "heading3": 5,
-            "heading4": 6, "heading5": 7, "heading6": 8,
-        }
-        key = heading_map.get(level, "heading2")
-        return {
-            "block_type": type_map[key],
-            key: {"elements": [{"text_run": {"content": text}}]},
-        }
-
-    @staticmethod
-    def text_block(text: str, bold: bool = False) -> dict:
-        element = {"text_run": {"content": text}}
-        if bold:
-            element["text_run"]["text_element_style"] = {"bold": True}
-        return {"block_type": 2, "text": {"elements": [element]}}
-
-    @staticmethod
-    def link_block(text: str, url: str) -> dict:
-        encoded_url = quote(url, safe="")
-        return {
-            "block_type": 2,
-            "text": {
-                "elements": [
-                    {
-                        "text_run": {
-                            "content": text,
-                            "text_element_style": {"link": {"url": encoded_url}},
-                        }
-                    }
-                ]
-            },
-        }
+    heading_block = staticmethod(heading_block)
+    text_block = staticmethod(text_block)
+    link_block = staticmethod(link_block)
+    divider_block = staticmethod(divider_block)
+    bullet_block = staticmethod(bullet_block)
 
-    @staticmethod
-    def divider_block() -> dict:
-        return {"block_type": 22, "divider": {}}
 
-    @staticmethod
-    def bullet_block(text: str) -> dict:
-        return {
-            "block_type": 12,
-            "bullet": {"elements": [{"text_run": {"content": text}}]},
-        }
+@lru_cache(maxsize=1)
+def get_client() -> FeishuClient:
+    """模块级懒加载单例：各子系统共享同一连接池与 token 缓存"""
+    return FeishuClient()
@@ -1,14 +1,17 @@
 """AI 科技新闻爬取模块 —— 从多个来源聚合最新 AI 新闻"""
 
 import re
+import asyncio
 import logging
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Callable, Optional
 from urllib.parse import urljoin, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
 from config import NEWS_SOURCES, SEARCH_QUERIES, NEWS_MAX_ARTICLES, NEWS_TODAY_ONLY
@@ -17,6 +20,22 @@ logger = logging.getLogger(__name__)
 
 # 请求超时与 UA
 TIMEOUT = 15
+# 抓取线程数（I/O 密集，socket 等待期间释放 GIL）
+MAX_WORKERS = 12
+
+# HTML 解析器：优先 lxml（C 实现，比 html.parser 快一个量级），未安装时回退
+try:
+    import lxml  # noqa: F401
+
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+# 补全发布时间走 aiohttp 并发；未安装时回退到线程池
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -28,9 +47,9 @@ HEADERS = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class NewsArticle:
-    """新闻文章数据结构"""
+    """新闻文章数据结构（__slots__ 省去每实例 __dict__，属性访问更快）"""
     title: str
     url: str
     summary: str = ""
@@ -38,22 +57,61 @@ class NewsArticle:
     category: str = ""
     published_at: Optional[str] = None
     tags: list = field(default_factory=list)
+    _uid: Optional[str] = field(default=None, repr=False, compare=False)
 
     @property
     def uid(self) -> str:
-        """基于 URL 的去重 ID"""
-        return hashlib.md5(self.url.encode()).hexdigest()[:12]
+        """基于 URL 的去重 ID（blake2b 比 md5 快且可直接指定摘要长度）"""
+        if self._uid is None:
+            self._uid = hashlib.blake2b(self.url.encode(), digest_size=6).hexdigest()
+        return self._uid
 
 
 # ── 网页爬取 ──────────────────────────────────────────────
 
+# 模块级 Session：复用 TCP/TLS 连接，供线程池并发抓取；
+# 若安装了 requests_cache，则带磁盘缓存（遵循 ETag/Cache-Control），热启动近零网络
+try:
+    import requests_cache
+
+    _session = requests_cache.CachedSession(
+        "feishu_news.cache", expire_after=1800, cache_control=True
+    )
+except ImportError:
+    _session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+
+# 页面体积上限：超大首页只取前 2MB 参与解析，声明超过 5MB 的直接跳过
+MAX_PAGE_BYTES = 2_000_000
+SKIP_PAGE_BYTES = 5_000_000
+
+
+# 同一轮爬取内同 URL 只解析一次；每轮开始时清空，调度器常驻进程跨天
+# 运行时才能拿到新页面（跨轮的 HTTP 缓存交给 requests_cache 的过期策略）。
+# 抓取失败不入缓存，瞬时网络错误不会把来源拉黑到进程结束
+_PAGE_CACHE: dict[str, BeautifulSoup] = {}
+
 
 def _fetch_page(url: str) -> Optional[BeautifulSoup]:
-    """获取并解析网页"""
+    """获取并解析网页（流式读取，限制最大体积；单轮内同 URL 只抓一次）"""
+    cached = _PAGE_CACHE.get(url)
+    if cached is not None:
+        return cached
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
-        resp.raise_for_status()
-        return BeautifulSoup(resp.text, "html.parser")
+        with _session.get(url, headers=HEADERS, timeout=TIMEOUT, stream=True) as resp:
+            resp.raise_for_status()
+            length = resp.headers.get("Content-Length")
+            if length and int(length) > SKIP_PAGE_BYTES:
+                logger.warning(f"⚠️  页面过大，跳过 [{url}]: {length} bytes")
+                return None
+            content = resp.raw.read(MAX_PAGE_BYTES, decode_content=True)
+        # 传 bytes 交由解析器处理编码
+        soup = BeautifulSoup(content, PARSER)
+        _PAGE_CACHE[url] = soup
+        return soup
     except Exception as e:
         logger.warning(f"⚠️  抓取失败 [{url}]: {e}")
         return None
@@ -67,6 +125,12 @@ def _extract_text(element, max_len: int = 300) -> str:
     return text[:max_len] + "..." if len(text) > max_len else text
 
 
+# 预编译日期/URL 正则（避免每次调用重新查缓存）
+_DATE_DASH_RE = re.compile(r"(20\d{2})[./-](\d{1,2})[./-](\d{1,2})")
+_DATE_CN_RE = re.compile(r"(20\d{2})年(\d{1,2})月(\d{1,2})日")
+_UDDG_RE = re.compile(r"uddg=([^&]+)")
+
+
 def _parse_datetime(text: str) -> Optional[datetime]:
     """解析常见日期格式为 datetime"""
     if not text:
@@ -75,43 +139,50 @@ def _parse_datetime(text: str) -> Optional[datetime]:
     if not raw:
         return None
 
-    # ISO 8601
+    # ISO 8601（先做廉价前缀判断，明显不是 ISO 时不付异常开销）
     candidate = raw.replace("Z", "+00:00")
-    try:
-        return datetime.fromisoformat(candidate)
-    except Exception:
-        pass
+    if len(candidate) >= 10 and candidate[4] == "-" and candidate[:4].isdigit():
+        try:
+            return datetime.fromisoformat(candidate)
+        except Exception:
+            pass
 
     # 2026-02-07 / 2026/02/07 / 2026.02.07
-    m = re.search(r"(20\d{2})[./-](\d{1,2})[./-](\d{1,2})", raw)
+    m = _DATE_DASH_RE.search(raw)
     if m:
         return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
 
     # 2026年02月07日
-    m = re.search(r"(20\d{2})年(\d{1,2})月(\d{1,2})日", raw)
-    if m:
-        return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    if "年" in raw:
+        m = _DATE_CN_RE.search(raw)
+        if m:
+            return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
 
     return None
 
 
+# 发布时间相关 meta 标签，合并为单个 CSS 选择器一次查完
+_META_KEYS = [
+    "article:published_time",
+    "og:published_time",
+    "publish_date",
+    "pubdate",
+    "date",
+    "datePublished",
+    "article:modified_time",
+]
+_META_SELECTOR = ", ".join(
+    f'meta[property="{k}"], meta[name="{k}"]' for k in _META_KEYS
+)
+
+
 def _extract_published_from_soup(soup: BeautifulSoup) -> str:
     """从文章页提取发布时间"""
-    meta_keys = [
-        "article:published_time",
-        "og:published_time",
-        "publish_date",
-        "pubdate",
-        "date",
-        "datePublished",
-        "article:modified_time",
-    ]
-    for meta in soup.find_all("meta"):
-        key = meta.get("property") or meta.get("name")
-        if key in meta_keys:
-            content = meta.get("content", "").strip()
-            if content:
-                return content
+    meta = soup.select_one(_META_SELECTOR)
+    if meta:
+        content = meta.get("content", "").strip()
+        if content:
+            return content
 
     time_el = soup.find("time")
     if time_el:
@@ -135,21 +206,55 @@ def _enrich_published_at(article: NewsArticle) -> Optional[datetime]:
     return dt
 
 
-def _is_today(dt: datetime) -> bool:
+def _is_today(dt: datetime, today=None) -> bool:
     """判断是否为当天内容（本地时区）"""
     if dt.tzinfo:
         dt = dt.astimezone()
-    return dt.date() == datetime.now().date()
+    return dt.date() == (today or datetime.now().date())
+
+
+async def _enrich_async(
+    session: "aiohttp.ClientSession", article: NewsArticle
+) -> Optional[datetime]:
+    """异步补全文章发布时间"""
+    dt = _parse_datetime(article.published_at or "")
+    if not dt:
+        try:
+            async with session.get(article.url, headers=HEADERS) as resp:
+                resp.raise_for_status()
+                html = await resp.read()
+            raw = _extract_published_from_soup(BeautifulSoup(html, PARSER))
+            dt = _parse_datetime(raw)
+        except Exception as e:
+            logger.warning(f"⚠️  抓取失败 [{article.url}]: {e}")
+    if dt:
+        article.published_at = dt.isoformat()
+    return dt
+
+
+async def _enrich_all_async(articles: list[NewsArticle]) -> list[Optional[datetime]]:
+    connector = aiohttp.TCPConnector(limit=20, limit_per_host=4)
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        return await asyncio.gather(*(_enrich_async(session, a) for a in articles))
+
+
+def _enrich_all(articles: list[NewsArticle]) -> list[Optional[datetime]]:
+    """并发补全所有文章发布时间（优先 aiohttp，缺省回退线程池）"""
+    if aiohttp is not None:
+        return asyncio.run(_enrich_all_async(articles))
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        return list(executor.map(_enrich_published_at, articles))
 
 
 def _filter_today_articles(articles: list[NewsArticle]) -> list[NewsArticle]:
-    """仅保留当天新闻"""
+    """仅保留当天新闻（并发补全发布时间）"""
     kept = []
-    for article in articles:
-        dt = _enrich_published_at(article)
+    today = datetime.now().date()  # 循环外求值，避免每篇文章各取一次系统时间
+    for article, dt in zip(articles, _enrich_all(articles)):
         if not dt:
             continue
-        if _is_today(dt):
+        if _is_today(dt, today):
             kept.append(article)
     logger.info(f"🧹 仅保留当天新闻: {len(kept)}/{len(articles)}")
     return kept
@@ -162,29 +267,32 @@ def _extract_articles_generic(soup: BeautifulSoup, base_url: str, source_name: s
     """通用文章提取：从页面中找 <article> 或含链接的标题"""
     articles = []
     seen_urls = set()
+    _append = articles.append
+    extract = _extract_text
+    join = urljoin
 
     # 策略 1: 查找 <article> 标签
     for article_el in soup.find_all("article", limit=20):
         link = article_el.find("a", href=True)
         if not link:
             continue
-        href = urljoin(base_url, link["href"])
+        href = join(base_url, link["href"])
         if href in seen_urls or not _is_valid_article_url(href, base_url):
             continue
         seen_urls.add(href)
 
         title_el = article_el.find(["h1", "h2", "h3", "h4"])
-        title = _extract_text(title_el) or _extract_text(link)
+        title = extract(title_el) or extract(link)
         if not title or len(title) < 5:
             continue
 
         summary_el = article_el.find("p")
-        summary = _extract_text(summary_el, 200)
+        summary = extract(summary_el, 200)
 
         time_el = article_el.find("time")
         pub_time = time_el.get("datetime", "") if time_el else ""
 
-        articles.append(
+        _append(
             NewsArticle(
                 title=title,
                 url=href,
@@ -200,37 +308,40 @@ def _extract_articles_generic(soup: BeautifulSoup, base_url: str, source_name: s
             link = heading.find("a", href=True)
             if not link:
                 continue
-            href = urljoin(base_url, link["href"])
+            href = join(base_url, link["href"])
             if href in seen_urls or not _is_valid_article_url(href, base_url):
                 continue
             seen_urls.add(href)
 
-            title = _extract_text(heading)
+            title = extract(heading)
             if not title or len(title) < 5:
                 continue
 
             # 尝试找相邻 <p> 作为摘要
             next_p = heading.find_next_sibling("p")
-            summary = _extract_text(next_p, 200) if next_p else ""
+            summary = extract(next_p, 200) if next_p else ""
 
-            articles.append(
+            _append(
                 NewsArticle(title=title, url=href, summary=summary, source=source_name)
             )
 
     return articles
 
 
+# 排除首页、分类页、标签页等（合并为单个正则，一次扫描替代 11 次子串查找）
+_SKIP_PATTERNS = [
+    "/category/", "/tag/", "/page/", "/author/",
+    "/search", "/login", "/signup", "/about",
+    "/contact", "/privacy", "/terms",
+]
+_SKIP_RE = re.compile("|".join(re.escape(p) for p in _SKIP_PATTERNS))
+
+
 def _is_valid_article_url(url: str, base_url: str) -> bool:
     """过滤掉非文章链接"""
     parsed = urlparse(url)
     path = parsed.path.lower()
-    # 排除首页、分类页、标签页等
-    skip_patterns = [
-        "/category/", "/tag/", "/page/", "/author/",
-        "/search", "/login", "/signup", "/about",
-        "/contact", "/privacy", "/terms",
-    ]
-    if any(p in path for p in skip_patterns):
+    if _SKIP_RE.search(path):
         return False
     # 至少要有一级以上的路径
     if path.count("/") < 2 and not path.endswith("/"):
@@ -243,40 +354,36 @@ def _is_valid_article_url(url: str, base_url: str) -> bool:
 
 def _extract_jiqizhixin(soup: BeautifulSoup) -> list[NewsArticle]:
     """机器之心专用提取"""
-    articles = []
-    for item in soup.select(".article-item, .article_item, .list-item", limit=15):
-        link = item.find("a", href=True)
-        if not link:
-            continue
-        href = urljoin("https://www.jiqizhixin.com", link["href"])
-        title = _extract_text(item.find(["h2", "h3", "h4", ".title"]))
-        if not title:
-            title = _extract_text(link)
-        summary = _extract_text(item.find(["p", ".summary", ".desc"]), 200)
-        if title and len(title) > 4:
-            articles.append(
-                NewsArticle(title=title, url=href, summary=summary, source="机器之心")
-            )
-    return articles
+    extract = _extract_text  # 局部别名，省去循环内的全局查找
+    return [
+        NewsArticle(
+            title=title,
+            url=urljoin("https://www.jiqizhixin.com", link["href"]),
+            summary=extract(item.find(["p", ".summary", ".desc"]), 200),
+            source="机器之心",
+        )
+        for item in soup.select(".article-item, .article_item, .list-item", limit=15)
+        if (link := item.find("a", href=True))
+        and (title := extract(item.find(["h2", "h3", "h4", ".title"])) or extract(link))
+        and len(title) > 4
+    ]
 
 
 def _extract_qbitai(soup: BeautifulSoup) -> list[NewsArticle]:
     """量子位专用提取"""
-    articles = []
-    for item in soup.select("article, .post-item, .news-item", limit=15):
-        link = item.find("a", href=True)
-        if not link:
-            continue
-        href = urljoin("https://www.qbitai.com", link["href"])
-        title = _extract_text(item.find(["h2", "h3", "h4"]))
-        if not title:
-            title = _extract_text(link)
-        summary = _extract_text(item.find("p"), 200)
-        if title and len(title) > 4:
-            articles.append(
-                NewsArticle(title=title, url=href, summary=summary, source="量子位")
-            )
-    return articles
+    extract = _extract_text
+    return [
+        NewsArticle(
+            title=title,
+            url=urljoin("https://www.qbitai.com", link["href"]),
+            summary=extract(item.find("p"), 200),
+            source="量子位",
+        )
+        for item in soup.select("article, .post-item, .news-item", limit=15)
+        if (link := item.find("a", href=True))
+        and (title := extract(item.find(["h2", "h3", "h4"])) or extract(link))
+        and len(title) > 4
+    ]
 
 
 # ── 搜索引擎补充 ──────────────────────────────────────────
@@ -287,9 +394,9 @@ def _search_web_news(query: str) -> list[NewsArticle]:
     articles = []
     try:
         search_url = f"https://html.duckduckgo.com/html/?q={requests.utils.quote(query)}"
-        resp = requests.get(search_url, headers=HEADERS, timeout=TIMEOUT)
+        resp = _session.get(search_url, headers=HEADERS, timeout=TIMEOUT)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = BeautifulSoup(resp.content, PARSER)
 
         for result in soup.select(".result, .web-result", limit=10):
             link = result.find("a", class_="result__a", href=True)
@@ -301,7 +408,7 @@ def _search_web_news(query: str) -> list[NewsArticle]:
             href = link.get("href", "")
             # DuckDuckGo 有时会包装 URL
             if "uddg=" in href:
-                match = re.search(r"uddg=([^&]+)", href)
+                match = _UDDG_RE.search(href)
                 if match:
                     href = requests.utils.unquote(match.group(1))
 
@@ -345,33 +452,52 @@ CATEGORY_KEYWORDS = {
     ],
 }
 
+# 关键词 → 分类映射（统一小写），配合单个合并正则实现一次线性扫描
+_KEYWORD_TO_CATEGORY = {
+    kw.lower(): cat
+    for cat, keywords in CATEGORY_KEYWORDS.items()
+    for kw in keywords
+}
+# 平分时按声明顺序取靠前的分类，与逐关键词子串查找时代的行为一致
+_CATEGORY_DECL_RANK = {cat: rank for rank, cat in enumerate(CATEGORY_KEYWORDS)}
+# 长关键词优先，保证 "open source" 不被 "open" 之类的前缀截胡
+_KEYWORD_PATTERN = re.compile(
+    "|".join(
+        re.escape(kw) for kw in sorted(_KEYWORD_TO_CATEGORY, key=len, reverse=True)
+    )
+)
+
 
 def _categorize(article: NewsArticle) -> str:
-    """根据标题和摘要自动分类"""
+    """根据标题和摘要自动分类（单次线性扫描替代逐关键词子串查找）"""
     text = f"{article.title} {article.summary}".lower()
-    scores = {}
-    for cat, keywords in CATEGORY_KEYWORDS.items():
-        scores[cat] = sum(1 for kw in keywords if kw.lower() in text)
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "📰 综合资讯"
+    scores: dict[str, int] = {}
+    for kw in set(_KEYWORD_PATTERN.findall(text)):
+        cat = _KEYWORD_TO_CATEGORY[kw]
+        scores[cat] = scores.get(cat, 0) + 1
+    if not scores:
+        return "📰 综合资讯"
+    # set 迭代顺序受哈希随机化影响，必须显式断平，否则平分结果每次进程不同
+    return max(scores, key=lambda cat: (scores[cat], -_CATEGORY_DECL_RANK[cat]))
 
 
 # ── 去重 ──────────────────────────────────────────────────
 
 
 def _deduplicate(articles: list[NewsArticle]) -> list[NewsArticle]:
-    """基于 URL hash 和标题相似度去重"""
-    seen_uids = set()
+    """基于 URL 和标题相似度去重"""
+    # set 成员判断本身就是 C 级字符串哈希，无需先算摘要
+    seen_urls = set()
     seen_titles = set()
     unique = []
     for a in articles:
-        if a.uid in seen_uids:
+        if a.url in seen_urls:
             continue
         # 简单标题去重：前 20 字符相同则视为重复
         title_key = a.title[:20].lower().strip()
         if title_key in seen_titles:
             continue
-        seen_uids.add(a.uid)
+        seen_urls.add(a.url)
         seen_titles.add(title_key)
         unique.append(a)
     return unique
@@ -380,50 +506,84 @@ def _deduplicate(articles: list[NewsArticle]) -> list[NewsArticle]:
 # ── 主入口 ────────────────────────────────────────────────
 
 
-def crawl_ai_news(max_articles: int = 0) -> list[NewsArticle]:
+def crawl_ai_news(
+    max_articles: int = 0,
+    seen: Optional[Callable[[str], bool]] = None,
+) -> list[NewsArticle]:
     """
     从多个来源爬取 AI 科技新闻
     返回去重、分类后的文章列表
+
+    参数:
+        seen: 可选的历史去重判定（如跨次运行的 Bloom 过滤器），命中的
+              URL 在补全发布时间等逐篇抓取之前就被跳过
     """
     max_articles = max_articles or NEWS_MAX_ARTICLES
+    # 常驻进程（scheduler）下跨轮必须重抓，否则永远只看到第一天的页面
+    _PAGE_CACHE.clear()
     all_articles: list[NewsArticle] = []
 
-    # 1) 爬取各新闻源
-    for source in NEWS_SOURCES:
-        logger.info(f"🔍 正在抓取: {source['name']} ({source['url']})")
-        soup = _fetch_page(source["url"])
-        if not soup:
-            continue
+    # 1) + 2) 并发抓取各新闻源与搜索引擎补充（I/O 密集，线程池重叠网络延迟）
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        soup_futures = [
+            executor.submit(_fetch_page, source["url"]) for source in NEWS_SOURCES
+        ]
+        search_futures = [
+            executor.submit(_search_web_news, query)
+            for query in SEARCH_QUERIES[:3]  # 限制搜索次数
+        ]
+
+        for source, future in zip(NEWS_SOURCES, soup_futures):
+            logger.info(f"🔍 正在抓取: {source['name']} ({source['url']})")
+            soup = future.result()
+            if not soup:
+                continue
 
-        if "jiqizhixin" in source["url"]:
-            articles = _extract_jiqizhixin(soup)
-        elif "qbitai" in source["url"]:
-            articles = _extract_qbitai(soup)
-        else:
-            articles = _extract_articles_generic(soup, source["url"], source["name"])
+            if "jiqizhixin" in source["url"]:
+                articles = _extract_jiqizhixin(soup)
+            elif "qbitai" in source["url"]:
+                articles = _extract_qbitai(soup)
+            else:
+                articles = _extract_articles_generic(soup, source["url"], source["name"])
 
-        logger.info(f"   → 获取到 {len(articles)} 篇文章")
-        all_articles.extend(articles)
+            logger.info(f"   → 获取到 {len(articles)} 篇文章")
+            all_articles.extend(articles)
 
-    # 2) 搜索引擎补充
-    for query in SEARCH_QUERIES[:3]:  # 限制搜索次数
-        logger.info(f"🔎 搜索补充: {query}")
-        search_results = _search_web_news(query)
-        all_articles.extend(search_results)
+        for query, future in zip(SEARCH_QUERIES[:3], search_futures):
+            logger.info(f"🔎 搜索补充: {query}")
+            all_articles.extend(future.result())
 
     # 3) 去重
     unique_articles = _deduplicate(all_articles)
 
-    # 4) 仅保留当天
-    if NEWS_TODAY_ONLY:
-        unique_articles = _filter_today_articles(unique_articles)
-
-    # 5) 分类
-    for article in unique_articles:
+    # 3.5) 跨次运行去重：历史已见文章不再付逐篇抓取与分类开销
+    if seen is not None:
+        fresh = [a for a in unique_articles if not seen(a.url)]
+        if len(fresh) < len(unique_articles):
+            logger.info(
+                f"🧹 跳过历史已推送文章: {len(unique_articles) - len(fresh)} 篇"
+            )
+        unique_articles = fresh
+
+    # 4) 补全发布时间（并发批量，仅在需要当天过滤时）
+    dts = _enrich_all(unique_articles) if NEWS_TODAY_ONLY else None
+
+    # 5) 当天过滤 + 分类 + 截断融合为一次遍历：
+    #    被过滤掉的与超出 max_articles 的文章不再付分类开销
+    today = datetime.now().date()
+    result: list[NewsArticle] = []
+    for i, article in enumerate(unique_articles):
+        if dts is not None:
+            dt = dts[i]
+            if not dt or not _is_today(dt, today):
+                continue
         article.category = _categorize(article)
+        result.append(article)
+        if len(result) >= max_articles:
+            break
 
-    # 6) 截断
-    result = unique_articles[:max_articles]
+    if dts is not None:
+        logger.info(f"🧹 仅保留当天新闻: {len(result)}/{len(unique_articles)}")
     logger.info(f"✅ 共获取 {len(result)} 篇去重后的 AI 新闻")
     return result
 
@@ -8,75 +8,152 @@ AI 新闻 → 飞书云文档 完整 Pipeline
 4. 支持定时自动执行
 """
 
+import hashlib
 import logging
+import os
 import sys
-from datetime import datetime
-from collections import defaultdict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from pathlib import Path
 
 from news_crawler import crawl_ai_news, NewsArticle
-from feishu_client import FeishuClient
+from feishu_client import (
+    FeishuClient,
+    bullet_block,
+    divider_block,
+    heading_block,
+    link_block,
+    text_block,
+)
 from config import FEISHU_GROUP_CHAT_ID, FEISHU_GROUP_NAME
 
 logger = logging.getLogger(__name__)
 
+# 预置时间格式，走 C 层 time.strftime，免去构造 datetime 对象
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+_DATE_FMT = "%Y年%m月%d日"
+
+# 文档内分类展示顺序
+_CATEGORY_RANK = {
+    cat: i
+    for i, cat in enumerate(
+        [
+            "🔥 重大发布",
+            "🔬 研究突破",
+            "💰 产业动态",
+            "🛠️ 工具与应用",
+            "🌍 政策与伦理",
+            "📰 综合资讯",
+        ]
+    )
+}
 
-def _build_feishu_blocks(articles: list[NewsArticle], date_str: str) -> list[dict]:
-    """将新闻列表转换为飞书文档 block 结构"""
-    blocks = []
-    fc = FeishuClient.__new__(FeishuClient)  # 仅用于调用 static 方法
+# 跨次运行的已推送文章 Bloom 状态（定时任务隔天去重用）
+_SEEN_BLOOM_PATH = Path(__file__).with_name(".news_seen.bloom")
+_SEEN_CAPACITY = 100_000
 
-    # ── 文档头部 ──
-    blocks.append(fc.text_block(f"📅 日期: {date_str}  |  共 {len(articles)} 篇"))
-    blocks.append(fc.text_block(f"⏰ 生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"))
-    blocks.append(fc.divider_block())
 
-    # ── 按分类分组 ──
-    categorized: dict[str, list[NewsArticle]] = defaultdict(list)
-    for a in articles:
-        categorized[a.category].append(a)
-
-    # 分类排序权重
-    category_order = [
-        "🔥 重大发布",
-        "🔬 研究突破",
-        "💰 产业动态",
-        "🛠️ 工具与应用",
-        "🌍 政策与伦理",
-        "📰 综合资讯",
-    ]
+class BloomFilter:
+    """轻量 Bloom 过滤器：约 10 bit/条目（≈1% 误判），O(1) 查询，无第三方依赖"""
 
-    for cat in category_order:
-        cat_articles = categorized.get(cat, [])
-        if not cat_articles:
-            continue
+    NUM_HASHES = 7
 
-        blocks.append(fc.heading_block(f"{cat} ({len(cat_articles)}篇)", level=2))
+    def __init__(self, capacity: int = 10000):
+        self._num_bits = capacity * 10
+        self._bits = bytearray(self._num_bits // 8 + 1)
 
-        for idx, article in enumerate(cat_articles, 1):
-            # 标题 (带链接)
-            blocks.append(fc.heading_block(f"{idx}. {article.title}", level=3))
+    def _positions(self, key: str) -> list[int]:
+        # 双重哈希从一次 blake2b 派生出 k 个位下标
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big")
+        return [(h1 + i * h2) % self._num_bits for i in range(self.NUM_HASHES)]
 
-            # 来源和链接
-            blocks.append(fc.link_block(f"🔗 {article.source}: {article.url}", article.url))
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
 
-            # 摘要
-            if article.summary:
-                blocks.append(fc.text_block(f"📝 {article.summary}"))
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[pos >> 3] >> (pos & 7) & 1 for pos in self._positions(key)
+        )
 
-            # 发布时间
-            if article.published_at:
-                blocks.append(fc.text_block(f"📅 发布: {article.published_at}"))
+    # ── 持久化：定时任务跨次运行复用历史去重状态 ──
+
+    def save(self, path: Path) -> None:
+        """原子落盘：先写临时文件再 rename，崩溃不会留下半截状态"""
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(self._num_bits.to_bytes(8, "big") + bytes(self._bits))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, capacity: int = 10000) -> "BloomFilter":
+        """从磁盘恢复；文件缺失或损坏时返回全新过滤器"""
+        bloom = cls(capacity=capacity)
+        try:
+            raw = path.read_bytes()
+            num_bits = int.from_bytes(raw[:8], "big")
+            bits = raw[8:]
+            if num_bits and len(bits) == num_bits // 8 + 1:
+                bloom._num_bits = num_bits
+                bloom._bits = bytearray(bits)
+        except (OSError, ValueError):
+            pass
+        return bloom
+
+
+def _dedup_articles(articles: list[NewsArticle]) -> list[NewsArticle]:
+    """URL + 归一化标题双键去重，砍掉重复文章的 block 构建与写入流量"""
+    bloom = BloomFilter(capacity=max(len(articles) * 10, 1000))
+    unique = []
+    for a in articles:
+        title_key = a.title.strip().lower()
+        if a.url in bloom or title_key in bloom:
+            continue
+        bloom.add(a.url)
+        bloom.add(title_key)
+        unique.append(a)
+    if len(unique) < len(articles):
+        logger.info(f"🧹 去重: {len(articles)} → {len(unique)} 篇")
+    return unique
+
+
+def _build_feishu_blocks(articles: list[NewsArticle], date_str: str) -> list[dict]:
+    """将新闻列表转换为飞书文档 block 结构"""
+    # ── 文档头部 ──
+    blocks = [
+        text_block(f"📅 日期: {date_str}  |  共 {len(articles)} 篇"),
+        text_block(f"⏰ 生成时间: {time.strftime(_TS_FMT)}"),
+        divider_block(),
+    ]
 
-        blocks.append(fc.divider_block())
+    # ── 按分类排序后单遍分组（省去 defaultdict 中转与逐分类查表）──
+    articles_sorted = sorted(
+        articles, key=lambda a: _CATEGORY_RANK.get(a.category, len(_CATEGORY_RANK))
+    )
+    for cat, group in groupby(articles_sorted, key=lambda a: a.category):
+        cat_articles = list(group)
+        blocks.append(heading_block(f"{cat} ({len(cat_articles)}篇)", level=2))
+        for idx, article in enumerate(cat_articles, 1):
+            # 标题（带链接）+ 来源 + 可选摘要/发布时间，一次 extend 入列
+            entry = [
+                heading_block(f"{idx}. {article.title}", level=3),
+                link_block(f"🔗 {article.source}: {article.url}", article.url),
+            ]
+            if article.summary:
+                entry.append(text_block(f"📝 {article.summary}"))
+            if article.published_at:
+                entry.append(text_block(f"📅 发布: {article.published_at}"))
+            blocks.extend(entry)
+        blocks.append(divider_block())
 
     # ── 文档尾部 ──
-    blocks.append(fc.heading_block("🎯 今日要点", level=2))
+    blocks.append(heading_block("🎯 今日要点", level=2))
     # 取前 3 篇作为要点
-    for i, a in enumerate(articles[:3], 1):
-        blocks.append(fc.bullet_block(f"{a.title} ({a.source})"))
-
-    blocks.append(fc.divider_block())
-    blocks.append(fc.text_block("—— 由 AI 新闻聚合 Pipeline 自动生成 ——"))
+    blocks.extend(bullet_block(f"{a.title} ({a.source})") for a in articles[:3])
+    blocks.append(divider_block())
+    blocks.append(text_block("—— 由 AI 新闻聚合 Pipeline 自动生成 ——"))
 
     return blocks
 
@@ -90,8 +167,7 @@ def _build_group_text(articles: list[NewsArticle], doc_url: str, date_str: str)
         "",
         "今日精选：",
     ]
-    for i, a in enumerate(articles[:5], 1):
-        lines.append(f"{i}. {a.title}")
+    lines.extend(f"{i}. {a.title}" for i, a in enumerate(articles[:5], 1))
     return "\n".join(lines)
 
 
@@ -108,12 +184,27 @@ def run_pipeline(dry_run: bool = False) -> dict:
     返回:
         {"status": "ok", "doc_url": "...", "article_count": N}
     """
-    date_str = datetime.now().strftime("%Y年%m月%d日")
+    date_str = time.strftime(_DATE_FMT)
     logger.info(f"🚀 开始执行 AI 新闻 Pipeline — {date_str}")
 
-    # 1. 爬取新闻
+    # 1. 爬取新闻（爬取内部已并发；这里再把飞书认证预热与爬取重叠）
     logger.info("📡 Phase 1: 爬取 AI 科技新闻...")
-    articles = crawl_ai_news()
+    client = None
+    # 历史去重：上次运行推送过的 URL 不再重复抓取/推送（dry-run 不参与）
+    seen_bloom = (
+        None if dry_run else BloomFilter.load(_SEEN_BLOOM_PATH, capacity=_SEEN_CAPACITY)
+    )
+    seen = (lambda url: url in seen_bloom) if seen_bloom is not None else None
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        crawl_future = executor.submit(crawl_ai_news, seen=seen)
+        if not dry_run:
+            try:
+                client = FeishuClient()
+                client.test_connection()
+            except Exception as e:
+                logger.warning(f"⚠️  飞书认证预热失败，稍后重试: {e}")
+                client = None
+        articles = crawl_future.result()
 
     if not articles:
         logger.warning("⚠️  未爬取到任何新闻，Pipeline 终止")
@@ -121,6 +212,9 @@ def run_pipeline(dry_run: bool = False) -> dict:
 
     logger.info(f"✅ 共获取 {len(articles)} 篇新闻")
 
+    # 跨来源兜底去重（爬虫内部已去重，此处拦截来源间的重复）
+    articles = _dedup_articles(articles)
+
     # 2. Dry Run 模式
     if dry_run:
         logger.info("\n📋 [DRY RUN] 新闻预览:")
@@ -138,7 +232,8 @@ def run_pipeline(dry_run: bool = False) -> dict:
 
     # 3. 创建飞书文档
     logger.info("📄 Phase 2: 创建飞书云文档...")
-    client = FeishuClient()
+    if client is None:
+        client = FeishuClient()
     doc_title = f"📰 AI 科技日报 — {date_str}"
     doc = client.create_document(doc_title)
     doc_id = doc["document_id"]
@@ -149,24 +244,34 @@ def run_pipeline(dry_run: bool = False) -> dict:
     logger.info("✍️  Phase 3: 写入新闻内容...")
     blocks = _build_feishu_blocks(articles, date_str)
 
-    # 飞书 API 每次最多写入 50 个 block，分批处理
-    BATCH_SIZE = 50
+    # 飞书 API 每次最多写入 50 个 block，由客户端分批处理。
+    # 追加子 block 必须按序提交，批次本身无法并发；但群聊 chat_id 的
+    # 分页查找与写入互不依赖，放到写入进行中并行完成，摊掉其 RTT。
     root_block_id = client.get_document_root_block(doc_id)
+    chat_id = FEISHU_GROUP_CHAT_ID
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        write_future = executor.submit(
+            client.write_blocks_bulk, doc_id, root_block_id, blocks
+        )
+        if not chat_id and FEISHU_GROUP_NAME:
+            try:
+                chat_id = client.find_chat_id_by_name(FEISHU_GROUP_NAME)
+            except Exception as e:
+                logger.warning(f"⚠️  获取群聊列表失败: {e}")
+        write_future.result()
+
+    # 写入成功后记录本次推送的 URL，下次运行直接跳过
+    if seen_bloom is not None:
+        for a in articles:
+            seen_bloom.add(a.url)
+        try:
+            seen_bloom.save(_SEEN_BLOOM_PATH)
+        except OSError as e:
+            logger.warning(f"⚠️  历史去重状态落盘失败: {e}")
 
-    for i in range(0, len(blocks), BATCH_SIZE):
-        batch = blocks[i : i + BATCH_SIZE]
-        client.write_blocks(doc_id, root_block_id, batch)
-        logger.info(f"   已写入 {min(i + BATCH_SIZE, len(blocks))}/{len(blocks)} blocks")
-
-    # 5) 发送到飞书群聊
+    # 5) 发送到飞书群聊（写入成功后才通知，避免群里拿到空文档链接）
     logger.info("📨 Phase 4: 发送到飞书群聊...")
     group_result = {"status": "skipped"}
-    chat_id = FEISHU_GROUP_CHAT_ID
-    if not chat_id and FEISHU_GROUP_NAME:
-        try:
-            chat_id = client.find_chat_id_by_name(FEISHU_GROUP_NAME)
-        except Exception as e:
-            logger.warning(f"⚠️  获取群聊列表失败: {e}")
     if chat_id:
         group_text = _build_group_text(articles, doc_url, date_str)
         try:
@@ -1,9 +1,10 @@
 """定时调度器 —— 支持独立运行或被 OpenClaw cron 调用"""
 
+import signal
+import sys
 import time
 import logging
 import schedule
-from datetime import datetime
 
 from config import NEWS_SCHEDULE_TIME
 from pipeline import run_pipeline
@@ -13,7 +14,7 @@ logger = logging.getLogger(__name__)
 
 def _job():
     """定时任务：执行新闻 pipeline"""
-    logger.info(f"⏰ [{datetime.now().strftime('%Y-%m-%d %H:%M')}] 定时任务触发")
+    logger.info(f"⏰ [{time.strftime('%Y-%m-%d %H:%M')}] 定时任务触发")
     try:
         result = run_pipeline(dry_run=False)
         if result["status"] == "ok":
@@ -24,19 +25,30 @@ def _job():
         logger.error(f"❌ Pipeline 执行失败: {e}", exc_info=True)
 
 
+def _handle_sigterm(signum, frame):
+    """长睡眠可被 SIGTERM 打断，保证干净退出"""
+    logger.info("🛑 收到 SIGTERM，调度器退出")
+    sys.exit(0)
+
+
 def start_scheduler():
     """启动定时调度器"""
     logger.info(f"📅 定时调度器启动 — 每天 {NEWS_SCHEDULE_TIME} 执行")
     schedule.every().day.at(NEWS_SCHEDULE_TIME).do(_job)
+    signal.signal(signal.SIGTERM, _handle_sigterm)
 
     # 也立即执行一次
     logger.info("🔄 首次运行...")
     _job()
 
-    # 持续运行
+    # 持续运行：精确睡到下一个任务点，而非每 60 秒轮询唤醒
     while True:
+        idle = schedule.idle_seconds()
+        if idle is None:
+            break
+        if idle > 0:
+            time.sleep(idle)
         schedule.run_pending()
-        time.sleep(60)
 
 
 if __name__ == "__main__":
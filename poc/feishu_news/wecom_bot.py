@@ -5,23 +5,35 @@ import hashlib
 import hmac
 import logging
 import time
+from functools import lru_cache
 from typing import Optional
 from urllib.parse import quote
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from config import WECOM_WEBHOOK_URL, WECOM_WEBHOOK_SECRET, WECOM_MENTION_MOBILES
+from feishu_client import _dump_json, _load_json
 
 logger = logging.getLogger(__name__)
 
+# 模块级 Session：keep-alive 复用 TLS 连接，调度器反复发送时省一次握手
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
+
+@lru_cache(maxsize=4)
+def _hmac_template(secret: str) -> "hmac.HMAC":
+    """按 secret 缓存 HMAC 模板：key schedule（内外 pad 异或）只算一次"""
+    return hmac.new(secret.encode(), b"", hashlib.sha256)
+
 
 def _build_signed_url(webhook_url: str, secret: str) -> str:
     """若机器人启用加密，拼接 timestamp/sign"""
     timestamp = str(int(time.time()))
-    string_to_sign = f"{timestamp}\n{secret}"
-    signature = base64.b64encode(
-        hmac.new(secret.encode(), string_to_sign.encode(), hashlib.sha256).digest()
-    ).decode()
+    h = _hmac_template(secret).copy()
+    h.update(f"{timestamp}\n{secret}".encode())
+    signature = base64.b64encode(h.digest()).decode()
     separator = "&" if "?" in webhook_url else "?"
     return f"{webhook_url}{separator}timestamp={timestamp}&sign={quote(signature)}"
 
@@ -48,9 +60,14 @@ def send_wecom_message(
         payload["text"]["mentioned_mobile_list"] = mobiles
 
     try:
-        resp = requests.post(url, json=payload, timeout=10)
+        resp = _SESSION.post(
+            url,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+            data=_dump_json(payload),
+            timeout=10,
+        )
         resp.raise_for_status()
-        data = resp.json()
+        data = _load_json(resp.content)
         if data.get("errcode") == 0:
             logger.info("✅ 企业微信群机器人消息发送成功")
             return {"status": "ok", "response": data}
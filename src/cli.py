@@ -8,6 +8,23 @@ from typing import Any, Dict
 
 import yaml
 
+try:
+    # libyaml C 解析器，比纯 Python Loader 快 5~10 倍
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import orjson
+
+    def _load_json_bytes(raw: bytes) -> Dict[str, Any]:
+        return orjson.loads(raw)
+
+except ImportError:
+
+    def _load_json_bytes(raw: bytes) -> Dict[str, Any]:
+        return json.loads(raw)
+
 from .core.checks import check_required_fields, run_checks
 from .core.generator import generate_sections
 from .core.intake import collect_inputs, normalize_inputs
@@ -19,16 +36,16 @@ from .render.docx import render_docx
 def load_config(path: Path) -> Dict[str, Any]:
     if not path.exists():
         return {}
-    return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    return yaml.load(path.read_text(encoding="utf-8"), Loader=_YamlLoader) or {}
 
 
 def load_input_file(path: Path) -> Dict[str, Any]:
     if not path.exists():
         raise FileNotFoundError(f"未找到输入文件：{path}")
     if path.suffix.lower() in {".yaml", ".yml"}:
-        return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        return yaml.load(path.read_text(encoding="utf-8"), Loader=_YamlLoader) or {}
     if path.suffix.lower() == ".json":
-        return json.loads(path.read_text(encoding="utf-8"))
+        return _load_json_bytes(path.read_bytes())
     raise ValueError("仅支持 .json/.yaml/.yml 输入文件")
 
 
@@ -1,6 +1,22 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+
+    def _dump_sorted(data: Dict[str, Any]) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS, default=str)
+
+except ImportError:
+
+    def _dump_sorted(data: Dict[str, Any]) -> bytes:
+        return json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode(
+            "utf-8"
+        )
 
 from .generator import SectionContent
 from .schema import REQUIRED_KEYS
@@ -10,21 +26,27 @@ def check_required_fields(data: Dict[str, Any]) -> List[str]:
     issues: List[str] = []
     for key in REQUIRED_KEYS:
         value = data.get(key)
-        if value is None:
-            issues.append(f"缺少必填字段：{key}")
-            continue
-        if isinstance(value, str) and not value.strip():
-            issues.append(f"缺少必填字段：{key}")
-        if isinstance(value, list) and not value:
+        if (
+            value is None
+            or (isinstance(value, str) and not value.strip())
+            or (isinstance(value, list) and not value)
+        ):
             issues.append(f"缺少必填字段：{key}")
     return issues
 
 
+def _iter_text(section: SectionContent):
+    # 显式栈迭代：不吃递归帧开销，也不受 sys.getrecursionlimit() 限制
+    stack = [section]
+    while stack:
+        current = stack.pop()
+        yield from current.paragraphs
+        yield from current.bullets
+        stack.extend(reversed(current.subsections))
+
+
 def _collect_text(section: SectionContent) -> List[str]:
-    texts = list(section.paragraphs) + list(section.bullets)
-    for sub in section.subsections:
-        texts.extend(_collect_text(sub))
-    return texts
+    return list(_iter_text(section))
 
 
 def _section_text(sections: List[SectionContent], title: str) -> str:
@@ -34,39 +56,115 @@ def _section_text(sections: List[SectionContent], title: str) -> str:
     return ""
 
 
+def _flatten(sections: List[SectionContent]) -> Dict[str, str]:
+    """一次遍历把各顶层章节拍平为 {标题: 文本}，供多个检查复用"""
+    return {section.title: "\n".join(_iter_text(section)) for section in sections}
+
+
+def _terms_pattern(terms: List[str]) -> "re.Pattern[str]":
+    # 长术语优先 + 前瞻断言，允许重叠命中，单次线性扫描找齐出现过的术语
+    alternation = "|".join(
+        re.escape(term) for term in sorted(terms, key=len, reverse=True)
+    )
+    return re.compile(f"(?=({alternation}))")
+
+
 def check_terms_consistency(
     sections: List[SectionContent],
     terms: Dict[str, str],
+    section_texts: Dict[str, str] | None = None,
 ) -> List[str]:
-    issues: List[str] = []
     if not terms:
-        return issues
+        return []
 
-    full_text = "\n".join(["\n".join(_collect_text(section)) for section in sections])
-    for term in terms.keys():
-        if term not in full_text:
-            issues.append(f"术语“{term}”未在正文中出现。")
-    return issues
+    # 流式扫描各段文本，不再物化整篇 full_text；全部术语命中即提前返回。
+    # 传入 section_texts 时直接复用拍平结果，省去一次树遍历。
+    if section_texts is not None:
+        chunks = iter(section_texts.values())
+    else:
+        chunks = (chunk for section in sections for chunk in _iter_text(section))
+
+    remaining = set(terms)
+    pattern = _terms_pattern(list(terms))
+    for chunk in chunks:
+        for m in pattern.finditer(chunk):
+            remaining.discard(m.group(1))
+        if remaining:
+            # 前瞻扫描可能漏掉仅以更长术语前缀形式出现的短术语，精确复查兜底
+            remaining = {t for t in remaining if t not in chunk}
+        if not remaining:
+            return []
+    return [f"术语“{term}”未在正文中出现。" for term in terms.keys() if term in remaining]
 
 
 def check_effects_coverage(
     sections: List[SectionContent],
     effects: List[str],
+    section_texts: Dict[str, str] | None = None,
 ) -> List[str]:
     issues: List[str] = []
     if not effects:
         return issues
-    invention_text = _section_text(sections, "发明内容")
+    if section_texts is not None:
+        invention_text = section_texts.get("发明内容", "")
+    else:
+        invention_text = _section_text(sections, "发明内容")
     for effect in effects:
         if effect and effect not in invention_text:
             issues.append(f"有益效果“{effect}”未在发明内容中体现。")
     return issues
 
 
+# 全套检查结果按（输入 + 正文）哈希记忆：重复提交同样内容时跳过正则扫描。
+# 正文指纹基于拍平文本计算，LLM 产出变化时键随之变化，不会回放旧结果
+_CHECK_CACHE: Dict[bytes, List[str]] = {}
+_CHECK_CACHE_MAX = 256
+
+
+def _check_cache_key(data: Dict[str, Any], section_texts: Dict[str, str]) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_dump_sorted(data))
+    for title, text in section_texts.items():
+        digest.update(title.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.digest()
+
+
 def run_checks(data: Dict[str, Any], sections: List[SectionContent]) -> List[str]:
+    # 拍平一次，术语与效果检查共用，避免每项检查各自重走章节树
+    section_texts = _flatten(sections)
+    key = _check_cache_key(data, section_texts)
+    cached = _CHECK_CACHE.get(key)
+    if cached is not None:
+        return list(cached)
+
     issues: List[str] = []
     issues.extend(check_required_fields(data))
-    issues.extend(check_terms_consistency(sections, data.get("terms") or {}))
+    issues.extend(
+        check_terms_consistency(sections, data.get("terms") or {}, section_texts)
+    )
     effects = data.get("effects_detail") or data.get("effects") or []
-    issues.extend(check_effects_coverage(sections, effects))
+    issues.extend(check_effects_coverage(sections, effects, section_texts))
+
+    if len(_CHECK_CACHE) >= _CHECK_CACHE_MAX:
+        _CHECK_CACHE.clear()
+    _CHECK_CACHE[key] = list(issues)
     return issues
+
+
+def validate(
+    data: Dict[str, Any], sections: Optional[List[SectionContent]] = None
+) -> Tuple[List[str], List[str]]:
+    """单入口校验：返回（必填缺项, 全文检查结果）。
+
+    sections 为 None 时只做必填检查（生成前的拦截点），传入 sections 后
+    走 run_checks 的记忆化全文检查，必填缺项直接从其结果中切出，
+    不再对 data 做第二遍遍历。
+    """
+    if sections is None:
+        return check_required_fields(data), []
+    issues = run_checks(data, sections)
+    missing = [issue for issue in issues if issue.startswith("缺少必填字段：")]
+    return missing, issues
@@ -1,16 +1,22 @@
 from __future__ import annotations
 
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class SectionContent:
     title: str
     paragraphs: List[str] = field(default_factory=list)
     bullets: List[str] = field(default_factory=list)
     subsections: List["SectionContent"] = field(default_factory=list)
+    # _has_content 的缓存位：构建期同一子树会被多层过滤反复查询
+    _content: Optional[bool] = field(default=None, repr=False, compare=False)
 
 
 def build_term_glossary(data: Dict[str, Any]) -> Dict[str, str]:
@@ -20,18 +26,25 @@ def build_term_glossary(data: Dict[str, Any]) -> Dict[str, str]:
         terms.update(custom_terms)
 
     components = data.get("core_components") or []
-    for comp in components:
-        comp = str(comp).strip()
-        if comp and comp not in terms:
-            terms[comp] = "指代本发明中的关键组成部分。"
+    # 先算新增键集合，再一次 dict.update 批量写入
+    known = terms.keys()
+    new_keys = [
+        comp
+        for comp in (str(c).strip() for c in components)
+        if comp and comp not in known
+    ]
+    terms.update(dict.fromkeys(new_keys, "指代本发明中的关键组成部分。"))
     return terms
 
 
+_SENT_ENDS = ("。", "！", "？")
+
+
 def _ensure_sentence(text: str) -> str:
     text = text.strip()
     if not text:
         return ""
-    if text[-1] not in "。！？":
+    if not text.endswith(_SENT_ENDS):
         return text + "。"
     return text
 
@@ -40,20 +53,17 @@ def _join_list(items: List[str]) -> str:
     return "、".join([item for item in items if item])
 
 
+# 中英文分号/逗号与换行统一视作列表分隔符，一次 C 层 split 完成切分
+_LIST_SEP_RE = re.compile(r"[;；,，\n]+")
+
+
 def _parse_list_value(value: Any) -> List[str]:
     if value is None:
         return []
     if isinstance(value, list):
         return [str(item).strip() for item in value if str(item).strip()]
     if isinstance(value, str):
-        normalized = value.replace("\n", ";").replace("；", ";").replace("，", ",")
-        items: List[str] = []
-        for raw in normalized.split(";"):
-            for part in raw.split(","):
-                item = part.strip()
-                if item:
-                    items.append(item)
-        return items
+        return [t for t in map(str.strip, _LIST_SEP_RE.split(value)) if t]
     return [str(value).strip()] if str(value).strip() else []
 
 
@@ -71,45 +81,126 @@ def _normalize_steps(steps: List[str]) -> List[str]:
 
 
 def _has_content(section: "SectionContent") -> bool:
-    if section.paragraphs or section.bullets:
-        return True
-    return any(_has_content(sub) for sub in section.subsections)
+    if section._content is not None:
+        return section._content
+    # 显式栈后序遍历，自底向上算一次并缓存，避免嵌套过滤时的重复递归
+    stack: List[Tuple[SectionContent, bool]] = [(section, False)]
+    while stack:
+        sec, visited = stack.pop()
+        if sec._content is not None:
+            continue
+        if sec.paragraphs or sec.bullets:
+            sec._content = True
+            continue
+        if visited:
+            sec._content = any(sub._content for sub in sec.subsections)
+        else:
+            stack.append((sec, True))
+            stack.extend((sub, False) for sub in sec.subsections)
+    return section._content
 
 
-def _filter_sections(sections: List["SectionContent"]) -> List["SectionContent"]:
+def _filter_sections(sections: Iterable["SectionContent"]) -> List["SectionContent"]:
     return [section for section in sections if _has_content(section)]
 
 
-def _split_paragraphs(text: str) -> Tuple[List[str], List[str]]:
+def _split_paragraphs_iter(lines: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """逐行分类，可直接消费流式输出，边接收边解析"""
     paragraphs: List[str] = []
     bullets: List[str] = []
-    for line in text.splitlines():
+    # 索引分派代替 if/elif 双分支；长度 2 的切片比较快于 startswith
+    targets = (paragraphs, bullets)
+    for line in lines:
         stripped = line.strip()
         if not stripped:
             continue
-        if stripped.startswith("- "):
-            bullets.append(stripped[2:].strip())
-        else:
-            paragraphs.append(stripped)
+        is_bullet = stripped[:2] == "- "
+        targets[is_bullet].append(stripped[2:].strip() if is_bullet else stripped)
     return paragraphs, bullets
 
 
-def _load_prompt(prompt_dir: Path, name: str) -> Optional[str]:
-    path = prompt_dir / f"{name}.txt"
+def _split_paragraphs(text: str) -> Tuple[List[str], List[str]]:
+    return _split_paragraphs_iter(text.splitlines())
+
+
+@lru_cache(maxsize=None)
+def _load_prompt_cached(prompt_dir: str, name: str) -> Optional[str]:
+    path = Path(prompt_dir) / f"{name}.txt"
     if not path.exists():
         return None
     return path.read_text(encoding="utf-8")
 
 
-def _render_prompt(template: str, context: Dict[str, Any]) -> str:
-    text = template
-    for key, value in context.items():
-        token = "{{" + key + "}}"
-        text = text.replace(token, str(value))
-    return text
+def _load_prompt(prompt_dir: Path, name: str) -> Optional[str]:
+    # 提示词文件在一次运行内不会变化，按 (目录, 名称) 缓存磁盘读取
+    return _load_prompt_cached(str(prompt_dir), name)
+
+
+_PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
+
+
+@lru_cache(maxsize=None)
+def _compile_template(template: str) -> Tuple[Tuple[bool, str], ...]:
+    """把模板一次性切成 (是否字面量, 文本/键名) 片段，渲染时单遍拼接"""
+    segments: List[Tuple[bool, str]] = []
+    pos = 0
+    for match in _PLACEHOLDER_RE.finditer(template):
+        if match.start() > pos:
+            segments.append((True, template[pos : match.start()]))
+        segments.append((False, match.group(1)))
+        pos = match.end()
+    if pos < len(template):
+        segments.append((True, template[pos:]))
+    return tuple(segments)
 
 
-def _technical_field_section(data: Dict[str, Any]) -> SectionContent:
+def _stringify_context(context: Dict[str, Any]) -> Dict[str, str]:
+    """上下文取值一次性转 str，供多个模板渲染复用"""
+    return {
+        key: value if isinstance(value, str) else str(value)
+        for key, value in context.items()
+    }
+
+
+def _render_prompt(template: str, context: Dict[str, Any]) -> str:
+    # 未提供的占位符保持原样，与旧的逐 key replace 行为一致；
+    # 已是 str 的值（如预先 _stringify_context 过的上下文）不再二次转换
+    parts: List[str] = []
+    for literal, text in _compile_template(template):
+        if literal:
+            parts.append(text)
+        elif text in context:
+            value = context[text]
+            parts.append(value if isinstance(value, str) else str(value))
+        else:
+            parts.append("{{" + text + "}}")
+    return "".join(parts)
+
+
+# 需要按列表解析的字段，build_rich_sections 开头统一解析一次供各构建器复用
+_LIST_FIELDS = (
+    "background_issues",
+    "core_components",
+    "core_components_detail",
+    "process_steps",
+    "process_steps_detail",
+    "implementation_steps_detail",
+    "alternatives_detail",
+    "effects",
+    "effects_detail",
+    "drawings",
+    "application_scenarios_list",
+    "application_scenarios",
+)
+
+
+def _preparse(data: Dict[str, Any]) -> Dict[str, List[str]]:
+    return {key: _parse_list_value(data.get(key)) for key in _LIST_FIELDS}
+
+
+def _technical_field_section(
+    data: Dict[str, Any], parsed: Dict[str, List[str]]
+) -> SectionContent:
     title = data.get("title", "")
     field = data.get("technical_field", "")
     detail = data.get("technical_field_detail", "")
@@ -125,11 +216,14 @@ def _technical_field_section(data: Dict[str, Any]) -> SectionContent:
     return SectionContent(title="技术领域", paragraphs=[p for p in paragraphs if p])
 
 
-def _background_section(data: Dict[str, Any]) -> SectionContent:
-    background = data.get("background", "")
-    status = data.get("background_status") or background
-    issues = _parse_list_value(data.get("background_issues"))
-    problem = data.get("problem_to_solve", "")
+def _background_section(
+    data: Dict[str, Any], parsed: Dict[str, List[str]]
+) -> SectionContent:
+    get = data.get  # 绑定为局部变量，循环内省去重复属性查找
+    background = get("background", "")
+    status = get("background_status") or background
+    issues = parsed["background_issues"]
+    problem = get("problem_to_solve", "")
 
     subsections: List[SectionContent] = []
     if status:
@@ -145,16 +239,19 @@ def _background_section(data: Dict[str, Any]) -> SectionContent:
             SectionContent(title="发明要解决的技术问题", paragraphs=[_ensure_sentence(problem)])
         )
 
-    subsections = _filter_sections(subsections)
+    # 子节点均按内容有无条件追加，空枝留给 build_rich_sections 末端统一剪
     if subsections:
         return SectionContent(title="背景技术", subsections=subsections)
     return SectionContent(title="背景技术", paragraphs=[_ensure_sentence(background)])
 
 
-def _invention_content_section(data: Dict[str, Any]) -> SectionContent:
-    problem = data.get("problem_to_solve", "")
-    solution = data.get("solution_overview", "")
-    purpose = data.get("invention_purpose", "")
+def _invention_content_section(
+    data: Dict[str, Any], parsed: Dict[str, List[str]]
+) -> SectionContent:
+    get = data.get
+    problem = get("problem_to_solve", "")
+    solution = get("solution_overview", "")
+    purpose = get("invention_purpose", "")
     terms = build_term_glossary(data)
 
     if not purpose:
@@ -177,23 +274,22 @@ def _invention_content_section(data: Dict[str, Any]) -> SectionContent:
             SectionContent(title="术语约定", bullets=term_bullets)
         )
 
-    components = _parse_list_value(data.get("core_components"))
-    components_detail = _parse_list_value(data.get("core_components_detail"))
-    steps_detail = _parse_list_value(data.get("process_steps_detail"))
-    steps = _parse_list_value(data.get("process_steps"))
-    alternatives_detail = _parse_list_value(data.get("alternatives_detail"))
+    components_detail = parsed["core_components_detail"]
+    steps_detail = parsed["process_steps_detail"]
+    alternatives_detail = parsed["alternatives_detail"]
     detail_present = bool(components_detail or steps_detail or alternatives_detail)
+    components = parsed["core_components"]
 
     core_paragraphs: List[str] = []
     if solution:
         core_paragraphs.append(_ensure_sentence(f"本发明通过以下技术方案实现：{solution}"))
-    if data.get("control_logic") and not detail_present:
+    if get("control_logic") and not detail_present:
         core_paragraphs.append(
-            _ensure_sentence(f"控制逻辑：{data.get('control_logic')}")
+            _ensure_sentence(f"控制逻辑：{get('control_logic')}")
         )
-    if data.get("parameters") and not detail_present:
+    if get("parameters") and not detail_present:
         core_paragraphs.append(
-            _ensure_sentence(f"关键参数：{data.get('parameters')}")
+            _ensure_sentence(f"关键参数：{get('parameters')}")
         )
 
     core_subsections: List[SectionContent] = []
@@ -212,13 +308,13 @@ def _invention_content_section(data: Dict[str, Any]) -> SectionContent:
             )
         )
 
-    steps_to_use = _normalize_steps(steps_detail or steps)
+    steps_to_use = _normalize_steps(steps_detail or parsed["process_steps"])
     if steps_to_use:
         core_subsections.append(
             SectionContent(title="预测流程步骤", bullets=steps_to_use)
         )
 
-    alternatives = data.get("alternatives", "")
+    alternatives = get("alternatives", "")
     if alternatives_detail:
         core_subsections.append(
             SectionContent(title="替换方案", bullets=alternatives_detail)
@@ -228,7 +324,6 @@ def _invention_content_section(data: Dict[str, Any]) -> SectionContent:
             SectionContent(title="替换方案", paragraphs=[_ensure_sentence(alternatives)])
         )
 
-    core_subsections = _filter_sections(core_subsections)
     if core_paragraphs or core_subsections:
         subsections.append(
             SectionContent(
@@ -238,15 +333,12 @@ def _invention_content_section(data: Dict[str, Any]) -> SectionContent:
             )
         )
 
-    effects_detail = _parse_list_value(data.get("effects_detail"))
-    effects = _parse_list_value(data.get("effects"))
-    effects_to_use = effects_detail or effects
+    effects_to_use = parsed["effects_detail"] or parsed["effects"]
     if effects_to_use:
         subsections.append(
             SectionContent(title="有益效果", bullets=effects_to_use)
         )
 
-    subsections = _filter_sections(subsections)
     if subsections:
         return SectionContent(title="发明内容", subsections=subsections)
 
@@ -257,16 +349,21 @@ def _invention_content_section(data: Dict[str, Any]) -> SectionContent:
     return SectionContent(title="发明内容", paragraphs=[p for p in paragraphs if p])
 
 
-def _drawings_section(data: Dict[str, Any]) -> SectionContent:
-    drawings = _parse_list_value(data.get("drawings"))
+def _drawings_section(
+    data: Dict[str, Any], parsed: Dict[str, List[str]]
+) -> SectionContent:
+    drawings = parsed["drawings"]
     notes = data.get("drawings_notes", "")
     bullets = drawings if drawings else ["本发明可选提供附图。"]
     paragraphs = [notes] if notes else []
     return SectionContent(title="附图说明", paragraphs=paragraphs, bullets=bullets)
 
 
-def _embodiments_section(data: Dict[str, Any]) -> SectionContent:
-    intro = data.get("embodiments", "")
+def _embodiments_section(
+    data: Dict[str, Any], parsed: Dict[str, List[str]]
+) -> SectionContent:
+    get = data.get
+    intro = get("embodiments", "")
     paragraphs = [
         "以下结合具体实施例对本发明的技术方案进行说明，但不构成对本发明的限制。",
     ]
@@ -274,24 +371,23 @@ def _embodiments_section(data: Dict[str, Any]) -> SectionContent:
         paragraphs.append(_ensure_sentence(intro))
 
     subsections: List[SectionContent] = []
-    preconditions = data.get("implementation_preconditions", "")
+    preconditions = get("implementation_preconditions", "")
     if preconditions:
         subsections.append(
             SectionContent(title="实施前提", paragraphs=[_ensure_sentence(preconditions)])
         )
 
-    steps_detail = _parse_list_value(data.get("implementation_steps_detail"))
-    if not steps_detail:
-        steps_detail = _parse_list_value(data.get("process_steps_detail"))
-    if not steps_detail:
-        steps_detail = _parse_list_value(data.get("process_steps"))
-    steps_detail = _normalize_steps(steps_detail)
+    steps_detail = _normalize_steps(
+        parsed["implementation_steps_detail"]
+        or parsed["process_steps_detail"]
+        or parsed["process_steps"]
+    )
     if steps_detail:
         subsections.append(
             SectionContent(title="具体实施步骤", bullets=steps_detail)
         )
 
-    implementation_effects = data.get("implementation_effects", "")
+    implementation_effects = get("implementation_effects", "")
     if implementation_effects:
         subsections.append(
             SectionContent(
@@ -299,7 +395,7 @@ def _embodiments_section(data: Dict[str, Any]) -> SectionContent:
             )
         )
 
-    alternative_example = data.get("alternative_example", "")
+    alternative_example = get("alternative_example", "")
     if alternative_example:
         subsections.append(
             SectionContent(
@@ -308,16 +404,15 @@ def _embodiments_section(data: Dict[str, Any]) -> SectionContent:
             )
         )
 
-    subsections = _filter_sections(subsections)
     return SectionContent(
         title="具体实施方式", paragraphs=paragraphs, subsections=subsections
     )
 
 
-def _application_section(data: Dict[str, Any]) -> SectionContent:
-    scenarios = _parse_list_value(data.get("application_scenarios_list"))
-    if not scenarios:
-        scenarios = _parse_list_value(data.get("application_scenarios"))
+def _application_section(
+    data: Dict[str, Any], parsed: Dict[str, List[str]]
+) -> SectionContent:
+    scenarios = parsed["application_scenarios_list"] or parsed["application_scenarios"]
     notes = data.get("application_notes", "")
     paragraphs: List[str] = []
     if notes:
@@ -331,16 +426,48 @@ def _application_section(data: Dict[str, Any]) -> SectionContent:
     return SectionContent(title="应用场景", paragraphs=paragraphs, bullets=scenarios)
 
 
+_SECTION_BUILDERS = (
+    _technical_field_section,
+    _background_section,
+    _invention_content_section,
+    _drawings_section,
+    _embodiments_section,
+    _application_section,
+)
+
+
+def _prune_empty(sections: List[SectionContent]) -> List[SectionContent]:
+    """单次后序遍历原地剔除无内容子树，替代各层构建器内的重复过滤"""
+    order: List[SectionContent] = []
+    stack = list(sections)
+    while stack:
+        sec = stack.pop()
+        order.append(sec)
+        stack.extend(sec.subsections)
+    for sec in reversed(order):
+        if sec.subsections:
+            sec.subsections = [sub for sub in sec.subsections if _has_content(sub)]
+    return [sec for sec in sections if _has_content(sec)]
+
+
 def build_rich_sections(data: Dict[str, Any]) -> List[SectionContent]:
-    sections = [
-        _technical_field_section(data),
-        _background_section(data),
-        _invention_content_section(data),
-        _drawings_section(data),
-        _embodiments_section(data),
-        _application_section(data),
-    ]
-    return _filter_sections(sections)
+    # 列表字段统一解析一次，各构建器共享；剪枝推迟到末端一次完成
+    parsed = _preparse(data)
+    return _prune_empty([build(data, parsed) for build in _SECTION_BUILDERS])
+
+
+def _llm_cache_path(
+    cache_dir: Path,
+    prompt: str,
+    model: Optional[str],
+    temperature: float,
+    max_tokens: int,
+) -> Path:
+    """按 (prompt, model, 采样参数) 派生缓存文件路径，两级目录避免单目录过大"""
+    key = hashlib.blake2b(
+        f"{model}|{temperature}|{max_tokens}|{prompt}".encode(), digest_size=16
+    ).hexdigest()
+    return cache_dir / key[:2] / key
 
 
 def _enhance_sections_with_llm(
@@ -358,6 +485,9 @@ def _enhance_sections_with_llm(
         "具体实施方式": "embodiments",
         "应用场景": "application",
     }
+    # 各章节模板共享同一上下文，字段只字符串化一次
+    ctx = _stringify_context(data)
+    tasks: List[Tuple[SectionContent, str]] = []
     for section in sections:
         prompt_name = prompt_map.get(section.title)
         if not prompt_name:
@@ -365,18 +495,67 @@ def _enhance_sections_with_llm(
         template = _load_prompt(prompt_dir, prompt_name)
         if not template:
             continue
-        prompt = _render_prompt(template, data)
-        text = provider.generate(
-            prompt,
+        tasks.append((section, _render_prompt(template, ctx)))
+    if not tasks:
+        return sections
+
+    use_stream = bool(provider_config.get("stream"))
+    # 磁盘缓存：同 prompt + 同采样参数的重复生成直接命中，开发迭代零时延。
+    # 未显式配置时仅在 temperature=0 默认开启——带采样的重新生成理应给出
+    # 新文本，静默回放缓存会让温度形同虚设
+    use_cache = provider_config.get("llm_cache")
+    if use_cache is None:
+        use_cache = not float(provider_config.get("temperature", 0.2) or 0)
+    cache_dir = prompt_dir.parent / ".llm_cache" if use_cache else None
+
+    def _generate_and_split(prompt: str) -> Tuple[List[str], List[str]]:
+        kwargs = dict(
             model=provider_config.get("model"),
             temperature=provider_config.get("temperature", 0.2),
             max_tokens=provider_config.get("max_tokens", 1200),
         )
-        paragraphs, bullets = _split_paragraphs(text)
-        if paragraphs:
-            section.paragraphs = paragraphs + section.paragraphs
-        if bullets:
-            section.bullets = bullets + section.bullets
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = _llm_cache_path(
+                cache_dir, prompt, kwargs["model"], kwargs["temperature"], kwargs["max_tokens"]
+            )
+            if cache_path.exists():
+                return _split_paragraphs(cache_path.read_text(encoding="utf-8"))
+        if use_stream:
+            # 流式模式下结果是行迭代器，网络接收与逐行解析重叠进行；
+            # 边消费边收集原文以便写缓存
+            collected: List[str] = []
+
+            def _tee(lines: Iterable[str]) -> Iterable[str]:
+                for line in lines:
+                    collected.append(line)
+                    yield line
+
+            result = _split_paragraphs_iter(
+                _tee(provider.generate(prompt, stream=True, **kwargs))
+            )
+            text = "\n".join(collected)
+        else:
+            text = provider.generate(prompt, **kwargs)
+            result = _split_paragraphs(text)
+        if cache_path is not None:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                cache_path.write_text(text, encoding="utf-8")
+            except OSError:
+                pass
+        return result
+
+    # 各章节的 LLM 调用相互独立且网络阻塞为主，线程池并发后
+    # 总时延趋近最慢的一次调用；结果合并仍在主线程串行
+    with ThreadPoolExecutor(max_workers=min(len(tasks), 6)) as executor:
+        futures = [executor.submit(_generate_and_split, prompt) for _, prompt in tasks]
+        for (section, _), future in zip(tasks, futures):
+            paragraphs, bullets = future.result()
+            if paragraphs:
+                section.paragraphs = paragraphs + section.paragraphs
+            if bullets:
+                section.bullets = bullets + section.bullets
     return sections
 
 
@@ -1,23 +1,22 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import re
+from typing import Any, Dict, List, Mapping
 
-from .schema import QUESTIONS, Question
+from .schema import NORMALIZE_PLAN, QUESTIONS, Question
+
+# 预编译分隔符：避免逐 replace 产生中间字符串，切分走 C 层单遍完成
+_LIST_SEP_RE = re.compile(r"[;；,，]+")
+_DICT_SEP_RE = re.compile(r"[;；]+")
 
 
 def parse_list(value: str) -> List[str]:
-    items: List[str] = []
-    for raw in value.replace("；", ";").replace("，", ",").split(";"):
-        for part in raw.split(","):
-            item = part.strip()
-            if item:
-                items.append(item)
-    return items
+    return [t for t in map(str.strip, _LIST_SEP_RE.split(value)) if t]
 
 
 def parse_dict(value: str) -> Dict[str, str]:
     pairs: Dict[str, str] = {}
-    for raw in value.replace("；", ";").split(";"):
+    for raw in _DICT_SEP_RE.split(value):
         item = raw.strip()
         if not item:
             continue
@@ -32,28 +31,40 @@ def parse_dict(value: str) -> Dict[str, str]:
 
 
 def normalize_value(value: Any, qtype: str) -> Any:
+    # 预处理过的 JSON 输入大多已是规范形态，命中快路径时直接返回原对象，
+    # 省去整列表/字典的重建分配
     if qtype == "list":
         if value is None:
             return []
         if isinstance(value, list):
+            if all(type(item) is str and item and item == item.strip() for item in value):
+                return value
             return [str(item).strip() for item in value if str(item).strip()]
         return parse_list(str(value))
     if qtype == "dict":
         if value is None:
             return {}
         if isinstance(value, dict):
+            if all(
+                type(k) is str and k and k == k.strip()
+                and type(v) is str and v == v.strip()
+                for k, v in value.items()
+            ):
+                return value
             return {str(k).strip(): str(v).strip() for k, v in value.items() if str(k).strip()}
         return parse_dict(str(value))
     if value is None:
         return ""
+    if type(value) is str and value == value.strip():
+        return value
     return str(value).strip()
 
 
-def normalize_inputs(data: Dict[str, Any]) -> Dict[str, Any]:
+def normalize_inputs(data: Mapping[str, Any]) -> Dict[str, Any]:
     normalized = dict(data)
-    for q in QUESTIONS:
-        if q.key in normalized:
-            normalized[q.key] = normalize_value(normalized[q.key], q.qtype)
+    for key, qtype in NORMALIZE_PLAN:
+        if key in normalized:
+            normalized[key] = normalize_value(normalized[key], qtype)
     return normalized
 
 
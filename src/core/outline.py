@@ -30,6 +30,10 @@ def build_outline(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     components = data.get("core_components", [])
     steps = data.get("process_steps", [])
     effects = data.get("effects", [])
+    # 先显式三元求值，空列表不再进 join；也消除 + 与 if 的优先级暗坑
+    comp_str = "；".join(components) if components else ""
+    steps_str = "；".join(steps) if steps else ""
+    effects_str = "；".join(effects) if effects else ""
 
     outline.append(
         {
@@ -37,9 +41,9 @@ def build_outline(data: Dict[str, Any]) -> List[Dict[str, Any]]:
             "bullets": [
                 f"技术问题：{data.get('problem_to_solve', '')}",
                 f"技术方案概述：{data.get('solution_overview', '')}",
-                "核心结构/模块：" + "；".join(components) if components else "核心结构/模块：",
-                "方法步骤：" + "；".join(steps) if steps else "方法步骤：",
-                "有益效果：" + "；".join(effects) if effects else "有益效果：",
+                f"核心结构/模块：{comp_str}",
+                f"方法步骤：{steps_str}",
+                f"有益效果：{effects_str}",
             ],
         }
     )
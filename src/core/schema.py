@@ -209,7 +209,10 @@ QUESTIONS: List[Question] = [
     ),
 ]
 
-REQUIRED_KEYS = [q.key for q in QUESTIONS if q.required]
+REQUIRED_KEYS = tuple(q.key for q in QUESTIONS if q.required)
+
+# 预展开 (key, qtype)，normalize_inputs 热路径免去逐题属性访问
+NORMALIZE_PLAN = tuple((q.key, q.qtype) for q in QUESTIONS)
 
 SECTION_ORDER = [
     "技术领域",
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import json
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Union
 
 
 class BaseProvider:
@@ -11,14 +12,32 @@ class BaseProvider:
         model: Optional[str] = None,
         temperature: float = 0.2,
         max_tokens: int = 1200,
-    ) -> str:
+        stream: bool = False,
+    ) -> Union[str, Iterator[str]]:
+        """生成文本；stream=True 时按行流式返回，便于边收边解析"""
         raise NotImplementedError
 
 
 class OpenAIProvider(BaseProvider):
     def __init__(self, api_key: str, base_url: str) -> None:
+        import requests
+        from requests.adapters import HTTPAdapter, Retry
+
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
+        # 复用 Session：多个章节连续生成时省去每次 TCP+TLS 握手，
+        # 并对瞬时错误自动退避重试
+        self._session = requests.Session()
+        self._session.mount(
+            "https://",
+            HTTPAdapter(
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                )
+            ),
+        )
 
     def generate(
         self,
@@ -26,9 +45,8 @@ class OpenAIProvider(BaseProvider):
         model: Optional[str] = None,
         temperature: float = 0.2,
         max_tokens: int = 1200,
-    ) -> str:
-        import requests
-
+        stream: bool = False,
+    ) -> Union[str, Iterator[str]]:
         if not model:
             raise ValueError("OpenAI provider 需要指定 model。")
 
@@ -40,11 +58,39 @@ class OpenAIProvider(BaseProvider):
             "temperature": temperature,
             "max_tokens": max_tokens,
         }
-        response = requests.post(url, json=payload, headers=headers, timeout=60)
+        if stream:
+            payload["stream"] = True
+            return self._generate_stream(url, headers, payload)
+        response = self._session.post(url, json=payload, headers=headers, timeout=60)
         response.raise_for_status()
         data = response.json()
         return data["choices"][0]["message"]["content"].strip()
 
+    def _generate_stream(
+        self, url: str, headers: Dict[str, str], payload: Dict[str, Any]
+    ) -> Iterator[str]:
+        """SSE 流式读取，按完整行产出：下游可边接收边解析，不缓冲整个响应体"""
+        response = self._session.post(
+            url, json=payload, headers=headers, timeout=60, stream=True
+        )
+        response.raise_for_status()
+        buffer = ""
+        for raw in response.iter_lines(decode_unicode=True):
+            if not raw or not raw.startswith("data: "):
+                continue
+            chunk = raw[6:]
+            if chunk == "[DONE]":
+                break
+            delta = json.loads(chunk)["choices"][0].get("delta", {}).get("content")
+            if not delta:
+                continue
+            buffer += delta
+            while "\n" in buffer:
+                line, buffer = buffer.split("\n", 1)
+                yield line
+        if buffer:
+            yield buffer
+
 
 def load_provider(config: Dict[str, Any]) -> Optional[BaseProvider]:
     provider = str(config.get("provider", "template")).lower()
@@ -1,43 +1,109 @@
 from __future__ import annotations
 
 import re
+from io import BytesIO
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from xml.sax.saxutils import escape
 
 from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
 
 from ..core.generator import SectionContent
 
+# 有序列表前缀（"1." / "S1"），模块加载时编译；非捕获组省掉分组分配
+_BULLET_RE = re.compile(r"^(?:\d+\.|S\d+)")
+
+
+# 模板 .docx 的字节缓存（按 mtime 失效）：缓存里存的是已删去全部段落的
+# 成品字节，zip 解包和清段只在磁盘读取时做一次，后续请求直接从内存重开
+_TEMPLATE_CACHE: Dict[str, Tuple[float, bytes]] = {}
+
+
+def _load_template(template_path: Path) -> Document:
+    key = str(template_path)
+    mtime = template_path.stat().st_mtime
+    cached = _TEMPLATE_CACHE.get(key)
+    if cached is None or cached[0] != mtime:
+        doc = Document(str(template_path))
+        _clear_document(doc)
+        buffer = BytesIO()
+        doc.save(buffer)
+        cached = (mtime, buffer.getvalue())
+        _TEMPLATE_CACHE[key] = cached
+        return doc
+    return Document(BytesIO(cached[1]))
+
 
 def _clear_document(doc: Document) -> None:
-    for paragraph in list(doc.paragraphs):
-        p = paragraph._element
-        p.getparent().remove(p)
+    # C 层一次扫删，不为每段构造 python-docx 包装对象
+    body = doc.element.body
+    for p in body.findall(qn("w:p")):
+        body.remove(p)
+
+
+def _paragraph_xml(text: str, style_id: Optional[str]) -> str:
+    """拼出单个 <w:p> 的 WordprocessingML，整批只做一次解析"""
+    run = f'<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+    if style_id:
+        return f'<w:p><w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>{run}</w:p>'
+    return f"<w:p>{run}</w:p>"
+
+
+class _StyleIds:
+    """按名称解析样式 ID，一次查找后缓存"""
 
+    def __init__(self, doc: Document):
+        self._styles = doc.styles
+        self._cache: Dict[str, str] = {}
 
-def _add_bullets(doc: Document, bullets: Iterable[str]) -> None:
+    def __call__(self, name: str) -> str:
+        style_id = self._cache.get(name)
+        if style_id is None:
+            style_id = self._styles[name].style_id
+            self._cache[name] = style_id
+        return style_id
+
+
+def _collect_bullets(
+    bullets: List[str], style_ids: _StyleIds, out: List[str]
+) -> None:
     for item in bullets:
         text = str(item).strip()
         if not text:
             continue
-        if re.match(r"^(\d+\.|S\d+)", text):
-            doc.add_paragraph(text, style="List Number")
+        if _BULLET_RE.match(text):
+            out.append(_paragraph_xml(text, style_ids("List Number")))
         else:
-            doc.add_paragraph(text, style="List Bullet")
+            out.append(_paragraph_xml(text, style_ids("List Bullet")))
+
+
+# 1..20 的中文数字一次性预排成表，每次调用只剩一次下标取值
+_CN_NUMERALS = ("一", "二", "三", "四", "五", "六", "七", "八", "九", "十")
+_CN_TABLE = ("",) + _CN_NUMERALS + tuple("十" + n for n in _CN_NUMERALS[:9]) + ("二十",)
+
+
+def _bulk_add_paragraphs(body, chunks: List[str]) -> None:
+    """整批 <w:p> 串一次解析后插到 w:sectPr 之前，不构造 python-docx 包装对象"""
+    if not chunks:
+        return
+    fragment = parse_xml(f'<w:body {nsdecls("w")}>{"".join(chunks)}</w:body>')
+    sect_pr = body.find(qn("w:sectPr"))
+    if sect_pr is not None:
+        for element in list(fragment):
+            sect_pr.addprevious(element)
+    else:
+        for element in list(fragment):
+            body.append(element)
 
 
 def _to_chinese_numeral(number: int) -> str:
-    numerals = ["一", "二", "三", "四", "五", "六", "七", "八", "九", "十"]
-    if 1 <= number <= 10:
-        return numerals[number - 1]
-    if 11 <= number <= 19:
-        return "十" + numerals[number - 11]
-    if number == 20:
-        return "二十"
-    return str(number)
+    return _CN_TABLE[number] if 0 < number <= 20 else str(number)
 
 
-def _heading_prefix(level: int, indices: List[int]) -> str:
+def _heading_prefix(level: int, indices: Tuple[int, ...]) -> str:
     if level == 1 and indices:
         return f"{_to_chinese_numeral(indices[0])}、"
     if indices:
@@ -45,23 +111,28 @@ def _heading_prefix(level: int, indices: List[int]) -> str:
     return ""
 
 
-def _render_section(
-    doc: Document,
-    section: SectionContent,
-    level: int,
-    indices: List[int],
+def _render_sections(
+    sections: List[SectionContent], style_ids: _StyleIds, out: List[str]
 ) -> None:
-    prefix = _heading_prefix(level, indices)
-    title = f"{prefix} {section.title}".strip()
-    doc.add_heading(title, level=min(level, 4))
-    for paragraph in section.paragraphs:
-        text = str(paragraph).strip()
-        if text:
-            doc.add_paragraph(text)
-    if section.bullets:
-        _add_bullets(doc, section.bullets)
-    for idx, sub in enumerate(section.subsections, start=1):
-        _render_section(doc, sub, level + 1, indices + [idx])
+    # 显式栈前序遍历：免去逐层递归调用与 indices + [idx] 的整表复制
+    stack: List[Tuple[SectionContent, int, Tuple[int, ...]]] = [
+        (sec, 1, (idx,)) for idx, sec in enumerate(sections, start=1)
+    ]
+    stack.reverse()
+    while stack:
+        section, level, indices = stack.pop()
+        prefix = _heading_prefix(level, indices)
+        title = f"{prefix} {section.title}".strip()
+        out.append(_paragraph_xml(title, style_ids(f"Heading {min(level, 4)}")))
+        for paragraph in section.paragraphs:
+            text = str(paragraph).strip()
+            if text:
+                out.append(_paragraph_xml(text, None))
+        if section.bullets:
+            _collect_bullets(section.bullets, style_ids, out)
+        subs = section.subsections
+        for idx in range(len(subs), 0, -1):
+            stack.append((subs[idx - 1], level + 1, indices + (idx,)))
 
 
 def render_docx(
@@ -71,13 +142,18 @@ def render_docx(
     use_template: bool = False,
 ) -> Path:
     if use_template and template_path and template_path.exists():
-        doc = Document(str(template_path))
-        _clear_document(doc)
+        # 缓存命中时模板已是清过段落的成品，请求路径不再扫删
+        doc = _load_template(template_path)
     else:
         doc = Document()
 
-    for idx, section in enumerate(sections, start=1):
-        _render_section(doc, section, level=1, indices=[idx])
+    # 整个正文先拼成一个 XML 串、一次解析，再整批挂到 body 的 sectPr 之前：
+    # 既避开 add_paragraph 每次插入的 body 重扫，也把 N 次元素构造合为一次解析
+    style_ids = _StyleIds(doc)
+    chunks: List[str] = []
+    _render_sections(sections, style_ids, chunks)
+
+    _bulk_add_paragraphs(doc.element.body, chunks)
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
     doc.save(str(output_path))
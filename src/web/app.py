@@ -1,42 +1,86 @@
 from __future__ import annotations
 
 import json
+import re
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import yaml
+
+try:
+    # libyaml C 解析器，比纯 Python Loader 快 5~10 倍
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import orjson
+
+    def _load_json_bytes(raw: bytes) -> Dict[str, Any]:
+        return orjson.loads(raw)
+
+except ImportError:
+
+    def _load_json_bytes(raw: bytes) -> Dict[str, Any]:
+        return json.loads(raw)
+
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from ..core.checks import check_required_fields, run_checks
+from ..core.checks import validate
 from ..core.generator import SectionContent, generate_sections
 from ..core.intake import normalize_inputs
 from ..core.schema import QUESTIONS, Question
 from ..core.utils import safe_filename
-from ..llm.provider import load_provider
+from ..llm.provider import BaseProvider, load_provider
+from ..render.docx import render_docx
 
 ROOT = Path(__file__).resolve().parents[2]
 TEMPLATE_DIR = ROOT / "web_templates"
 SAMPLE_PATH = ROOT / "tests" / "fixtures" / "sample_input.json"
+# 常用路径一次拼好：每段 / 拼接都会新建 Path 对象，热路径上没必要重复做
+CONFIG_PATH = ROOT / "src" / "config" / "config.yaml"
+DEFAULT_OUTPUT_DIR = ROOT / "outputs"
+DEFAULT_TEMPLATE_PATH = Path("templates/disclosure.docx")
 
 app = FastAPI(title="专利交底书生成器")
 app.mount("/static", StaticFiles(directory=ROOT / "static"), name="static")
 templates = Jinja2Templates(directory=str(TEMPLATE_DIR))
+# 模板对象只解析一次，免去每个请求的环境查找
+_INDEX_TMPL = templates.get_template("index.html")
+
+# 下载文件名校验：取 safe_filename 黑名单的补集（含路径分隔符，天然挡掉
+# 目录遍历）+ 后缀检查，一次 match 完成；不能收得更紧，否则会拒掉
+# 自己刚生成的带中文标点的文件名
+_SAFE_NAME_RE = re.compile(r'^[^/\\:*?"<>|]{1,200}\.docx\Z')
+
+
+# mtime 进缓存键：文件一改缓存即失效，未改则每个请求省一次读盘+解析
+@lru_cache(maxsize=8)
+def _load_config_cached(path_str: str, mtime: float) -> Dict[str, Any]:
+    return yaml.load(Path(path_str).read_text(encoding="utf-8"), Loader=_YamlLoader) or {}
 
 
 def load_config(path: Path) -> Dict[str, Any]:
     if not path.exists():
         return {}
-    return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    return _load_config_cached(str(path), path.stat().st_mtime)
+
+
+@lru_cache(maxsize=2)
+def _load_sample_cached(mtime: float) -> Dict[str, Any]:
+    return _load_json_bytes(SAMPLE_PATH.read_bytes())
 
 
 def load_sample_data() -> Dict[str, Any]:
     if not SAMPLE_PATH.exists():
         return {}
-    return json.loads(SAMPLE_PATH.read_text(encoding="utf-8"))
+    return _load_sample_cached(SAMPLE_PATH.stat().st_mtime)
 
 
 def format_value_for_form(value: Any, question: Question) -> str:
@@ -44,16 +88,23 @@ def format_value_for_form(value: Any, question: Question) -> str:
         return ""
     if question.qtype == "list":
         if isinstance(value, list):
-            return "；".join([str(item) for item in value])
+            # 0/1 元素是最常见情形，直接返回省掉 join；多元素走 map(str, ...)
+            # 的 C 层迭代（str 对 str 实例原样返回，不产生新对象）
+            if not value:
+                return ""
+            if len(value) == 1:
+                first = value[0]
+                return first if isinstance(first, str) else str(first)
+            return "；".join(map(str, value))
         return str(value)
     if question.qtype == "dict":
         if isinstance(value, dict):
-            return "；".join([f"{k}={v}" for k, v in value.items()])
+            return "；".join(f"{k}={v}" for k, v in value.items())
         return str(value)
     return str(value)
 
 
-def build_grouped_questions() -> List[Dict[str, Any]]:
+def _build_grouped_questions_impl() -> List[Dict[str, Any]]:
     group_keys = [
         {
             "title": "基础信息",
@@ -117,6 +168,27 @@ def build_grouped_questions() -> List[Dict[str, Any]]:
     return groups
 
 
+# QUESTIONS 是静态数据，分组结果进程内只需构建一次
+GROUPED_QUESTIONS = _build_grouped_questions_impl()
+
+
+def build_grouped_questions() -> List[Dict[str, Any]]:
+    return GROUPED_QUESTIONS
+
+
+# provider 实例按配置签名复用：OpenAI provider 持有带连接池的 Session，
+# 每个请求重建会丢掉 keep-alive 连接，重新握手 TCP+TLS
+@lru_cache(maxsize=4)
+def _cached_provider(config_json: str) -> Optional[BaseProvider]:
+    return load_provider(json.loads(config_json))
+
+
+def get_provider(config: Dict[str, Any]) -> Optional[BaseProvider]:
+    return _cached_provider(
+        json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    )
+
+
 def resolve_output_path(title: str, output_dir: Path) -> Path:
     output_dir.mkdir(parents=True, exist_ok=True)
     base = safe_filename(title)
@@ -135,43 +207,40 @@ def _render_index(
     config = config or {}
     data = data or {}
     issues = issues or []
-    groups = build_grouped_questions()
     download_name = data.get("download_name", "")
     form_values = {
         q.key: format_value_for_form(data.get(q.key), q) for q in QUESTIONS
     }
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "groups": groups,
-            "form_values": form_values,
-            "download_name": download_name,
-            "sections": sections,
-            "issues": issues,
-            "error": error,
-            "web_title": config.get("web_title", "专利交底书生成器"),
-            "provider": config.get("provider", "template"),
-            "use_template": bool(config.get("use_template")),
-        },
+    return HTMLResponse(
+        _INDEX_TMPL.render(
+            request=request,
+            groups=GROUPED_QUESTIONS,
+            form_values=form_values,
+            download_name=download_name,
+            sections=sections,
+            issues=issues,
+            error=error,
+            web_title=config.get("web_title", "专利交底书生成器"),
+            provider=config.get("provider", "template"),
+            use_template=bool(config.get("use_template")),
+        )
     )
 
 
 @app.get("/", response_class=HTMLResponse)
 def index(request: Request, sample: int = 0) -> HTMLResponse:
-    config = load_config(ROOT / "src" / "config" / "config.yaml")
+    config = load_config(CONFIG_PATH)
     data = load_sample_data() if sample else {}
     return _render_index(request, data=data, config=config)
 
 
 @app.post("/generate", response_class=HTMLResponse)
 async def generate(request: Request) -> HTMLResponse:
-    config = load_config(ROOT / "src" / "config" / "config.yaml")
+    config = load_config(CONFIG_PATH)
     try:
-        form = await request.form()
-        raw_data = {k: v for k, v in form.items()}
-        data = normalize_inputs(raw_data)
-        missing = check_required_fields(data)
+        # normalize_inputs 内部本就复制一次，不必先把 FormData 抄成 dict
+        data = normalize_inputs(await request.form())
+        missing, _ = validate(data)
         if missing:
             return _render_index(
                 request,
@@ -181,19 +250,25 @@ async def generate(request: Request) -> HTMLResponse:
                 config=config,
             )
 
-        provider = load_provider(config)
+        provider = get_provider(config)
         prompt_dir = Path(config.get("prompt_dir", "prompts"))
-        sections = generate_sections(data, provider, prompt_dir, config)
-        issues = run_checks(data, sections)
+        # LLM 调用与 docx 写盘都是同步阻塞操作，丢进线程池让事件循环
+        # 继续接其它请求，吞吐随工作线程数扩展
+        sections = await run_in_threadpool(
+            generate_sections, data, provider, prompt_dir, config
+        )
+        _, issues = validate(data, sections)
 
-        output_dir = ROOT / config.get("output_dir", "outputs")
+        out = config.get("output_dir")
+        output_dir = ROOT / out if out else DEFAULT_OUTPUT_DIR
         output_path = resolve_output_path(data.get("title", "交底书"), output_dir)
-        from ..render.docx import render_docx
-
-        render_docx(
+        await run_in_threadpool(
+            render_docx,
             sections,
             output_path=output_path,
-            template_path=Path(config.get("template_path", "templates/disclosure.docx")),
+            template_path=Path(config["template_path"])
+            if config.get("template_path")
+            else DEFAULT_TEMPLATE_PATH,
             use_template=bool(config.get("use_template")),
         )
         data["download_name"] = output_path.name
@@ -217,12 +292,20 @@ async def generate(request: Request) -> HTMLResponse:
 
 @app.get("/download/{filename}")
 def download(filename: str) -> FileResponse:
-    config = load_config(ROOT / "src" / "config" / "config.yaml")
-    output_dir = ROOT / config.get("output_dir", "outputs")
-    safe_name = Path(filename).name
-    if not safe_name.endswith(".docx"):
+    config = load_config(CONFIG_PATH)
+    out = config.get("output_dir")
+    output_dir = ROOT / out if out else DEFAULT_OUTPUT_DIR
+    if not _SAFE_NAME_RE.match(filename):
         raise FileNotFoundError("不支持的文件格式")
-    path = output_dir / safe_name
-    if not path.exists():
+    path = output_dir / filename
+    # 一次 stat 既做存在性检查又传给 FileResponse，省掉其内部重复 stat
+    try:
+        st = path.stat()
+    except OSError:
         raise FileNotFoundError("文件不存在")
-    return FileResponse(path, filename=safe_name, media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+    return FileResponse(
+        path,
+        filename=filename,
+        stat_result=st,
+        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    )
@@ -6,8 +6,8 @@ import unittest
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "src"))
 
-from core.checks import run_checks  # noqa: E402
-from core.generator import generate_sections  # noqa: E402
+from core.checks import run_checks, validate  # noqa: E402
+from core.generator import SectionContent, generate_sections  # noqa: E402
 
 
 class CheckTests(unittest.TestCase):
@@ -19,5 +19,33 @@ class CheckTests(unittest.TestCase):
         self.assertEqual(issues, [])
 
 
+class ValidateTests(unittest.TestCase):
+    def test_without_sections_only_checks_required(self) -> None:
+        missing, issues = validate({"title": "x"})
+        self.assertTrue(missing)
+        for issue in missing:
+            self.assertTrue(issue.startswith("缺少必填字段："))
+        self.assertEqual(issues, [])
+
+    def test_with_sections_derives_missing_from_issues(self) -> None:
+        data = {"title": "x", "effects": ["省电"]}
+        sections = [SectionContent("发明内容", paragraphs=["正文"])]
+        missing, issues = validate(data, sections)
+        self.assertTrue(missing)
+        for issue in missing:
+            self.assertIn(issue, issues)
+        self.assertTrue(any("省电" in issue for issue in issues))
+
+    def test_cache_invalidates_when_sections_change(self) -> None:
+        data = {"title": "x", "effects": ["省电"]}
+        uncovered = [SectionContent("发明内容", paragraphs=["正文"])]
+        covered = [SectionContent("发明内容", paragraphs=["本方案省电。"])]
+        first = run_checks(data, uncovered)
+        self.assertEqual(run_checks(data, uncovered), first)
+        second = run_checks(data, covered)
+        self.assertNotEqual(first, second)
+        self.assertFalse(any("省电" in issue for issue in second))
+
+
 if __name__ == "__main__":
     unittest.main()
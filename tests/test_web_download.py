@@ -0,0 +1,29 @@
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.web.app import DEFAULT_OUTPUT_DIR, download, resolve_output_path  # noqa: E402
+
+
+class DownloadTests(unittest.TestCase):
+    def test_generated_name_round_trip(self) -> None:
+        # safe_filename 不会清理中文标点，下载校验必须放行这类自家生成的文件名
+        path = resolve_output_path("一种（新型）智能装置", DEFAULT_OUTPUT_DIR)
+        path.write_bytes(b"stub")
+        try:
+            response = download(path.name)
+            self.assertEqual(response.status_code, 200)
+        finally:
+            path.unlink()
+
+    def test_rejects_traversal_and_wrong_suffix(self) -> None:
+        for bad in ("../x.docx", "a/b.docx", "a\\b.docx", "x.doc", "x.docx\n", ""):
+            with self.assertRaises(FileNotFoundError):
+                download(bad)
+
+
+if __name__ == "__main__":
+    unittest.main()